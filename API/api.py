@@ -1,22 +1,126 @@
 from redbot.core import commands, Config
+from redbot.core.data_manager import cog_data_path
 from discord.ext import tasks
 import aiohttp
 import discord
 import asyncio
+import hashlib
+import json
 import logging
+import time
+from datetime import datetime, timezone
+
+from .breaker import CircuitBreaker
+from .metrics import PipelineMetrics
+from .scheduler import PollScheduler
+from .timeseries import TIERS, TimeSeriesStore
 
 log = logging.getLogger("red.api")  # Logging für Fehlerausgabe
 
+SCHEDULER_TICK_SECONDS = 10  # Wie oft der Scheduler auf fällige Controller prüft
+
+
+def group_instances_by_controller(instances: dict) -> dict:
+    """Gruppiert Instanz-IDs nach (api_url, username), also nach ADS-Controller und Zugang."""
+    groups = {}
+    for instance_id, info in instances.items():
+        groups.setdefault((info["api_url"], info["username"]), []).append(instance_id)
+    return groups
+
+
+def embed_fingerprint(embed: discord.Embed) -> str:
+    """Fingerabdruck des sichtbaren Embed-Inhalts, ohne den bei jedem Aufbau neuen Zeitstempel."""
+    data = embed.to_dict()
+    data.pop("timestamp", None)
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def pack_embeds(embeds: list, max_embeds: int = 10, max_chars: int = 6000) -> list:
+    """Verteilt Embeds auf möglichst wenige Nachrichten (Discord: max. 10 Embeds und 6000 Zeichen)."""
+    pages = []
+    page, page_chars = [], 0
+    for embed in embeds:
+        size = len(embed)
+        if page and (len(page) >= max_embeds or page_chars + size > max_chars):
+            pages.append(page)
+            page, page_chars = [], 0
+        page.append(embed)
+        page_chars += size
+    if page:
+        pages.append(page)
+    return pages
+
+
+def player_count_of(status) -> int:
+    """Liest die aktuelle Spielerzahl als Zahl aus den AMP-Statusdaten."""
+    raw_value = (status or {}).get("Metrics", {}).get("Active Users", {}).get("RawValue", 0)
+    try:
+        return int(raw_value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_duration(text: str) -> int:
+    """Wandelt Angaben wie `12h`, `7d` oder `4w` in Sekunden um."""
+    units = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+    text = text.strip().lower()
+    if len(text) < 2 or text[-1] not in units or not text[:-1].isdigit():
+        raise commands.BadArgument(f"Ungültiger Zeitraum: {text}")
+    return int(text[:-1]) * units[text[-1]]
+
+
+def extract_instance_statuses(data) -> dict:
+    """Liest aus einer ADSModule/GetInstances-Antwort die Statusdaten pro InstanceID aus."""
+    if isinstance(data, dict):
+        # Manche AMP-Versionen verpacken die Liste in {"result": [...]}
+        data = data.get("result", [])
+    statuses = {}
+    for target in data or []:
+        for instance in target.get("AvailableInstances", []):
+            instance_id = instance.get("InstanceID")
+            if instance_id:
+                statuses[instance_id] = instance
+    return statuses
+
+
 class API(commands.Cog):
     """Cog zur Abfrage mehrerer AMP-Instanzen und Ausgabe in Discord."""
 
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=1234567890)
-        default_global = {"instances": {}, "channel_id": 0}
+        default_global = {
+            "instances": {},
+            "channel_id": 0,
+            "max_parallel": 8,  # Maximale Anzahl gleichzeitiger AMP-Abfragen
+            "poll_timeout": 25,  # Zeitlimit pro Instanz in Sekunden (Login + Status)
+            "pool_limit": 100,  # Maximale Anzahl offener Verbindungen insgesamt
+            "pool_limit_per_host": 10,  # Maximale Anzahl offener Verbindungen pro AMP-Host
+            "session_ttl": 600,  # Wie lange eine AMP-Session-ID wiederverwendet wird (Sekunden)
+            "heartbeat_minutes": 0,  # Unveränderte Embeds spätestens nach so vielen Minuten neu schreiben (0 = nie)
+            "poll_interval": 120,  # Normales Abfrageintervall pro Controller (Sekunden)
+            "min_poll_interval": 30,  # Abstand nach einer Zustandsänderung (Sekunden)
+            "max_poll_interval": 1800,  # Obergrenze beim Zurückfahren nicht erreichbarer Controller (Sekunden)
+            "breaker_threshold": 3,  # Fehler in Folge, nach denen ein Controller als offline gilt
+            "breaker_cooldown": 300,  # Wartezeit bis zur nächsten Probeanfrage an einen offline Controller (Sekunden)
+            "status_freshness": 60,  # Ab diesem Alter (Sekunden) frischt !instancestatus den Status neu ab
+            "board_mode": False,  # Alle Instanzen kompakt in wenigen Board-Nachrichten statt einer pro Instanz
+            "board_message_ids": [],  # Nachrichten des Boards in Anzeigereihenfolge
+            "metrics_dump": "off"  # Metrik-Datei unter cog_data_path: "off", "json" oder "prometheus"
+        }
         self.config.register_global(**default_global)
         self.ensure_config_initialized()
-        self.status_updater.start()
+        self.session = None  # Gemeinsame aiohttp-Session für alle AMP-Anfragen
+        self.pool_stats = {"requests": 0, "connections_created": 0, "connections_reused": 0}
+        self.amp_sessions = {}  # (api_url, username) -> (session_id, gültig_bis)
+        self.amp_logins = {}  # (api_url, username) -> laufender Login-Task
+        self.embed_fingerprints = {}  # instance_id -> (fingerabdruck, message_id, letzte_bearbeitung)
+        self.scheduler = PollScheduler()
+        self.poll_lock = asyncio.Lock()  # Verhindert überlappende Abfragen (Scheduler und !updateinstances)
+        self.breakers = {}  # api_url -> CircuitBreaker
+        self.timeseries = TimeSeriesStore(str(cog_data_path(self) / "timeseries"))
+        self.last_status = {}  # instance_id -> (status, error, abgefragt_um)
+        self.metrics = PipelineMetrics()
 
     def ensure_config_initialized(self):
         """Stellt sicher, dass alle Konfigurationswerte existieren."""
@@ -25,8 +129,46 @@ class API(commands.Cog):
         if not self.config.channel_id():
             self.config.channel_id.set(0)
 
-    def cog_unload(self):
+    async def cog_load(self):
+        await self.open_http_session()
+        self.status_updater.start()
+
+    async def cog_unload(self):
         self.status_updater.cancel()
+        self.timeseries.flush()
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+    async def open_http_session(self):
+        """Öffnet die gemeinsame aiohttp-Session mit Keep-Alive-Verbindungspool."""
+        limit = await self.config.pool_limit()
+        limit_per_host = await self.config.pool_limit_per_host()
+        connector = aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host, keepalive_timeout=60)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._trace_request_start)
+        trace_config.on_connection_create_end.append(self._trace_connection_created)
+        trace_config.on_connection_reuseconn.append(self._trace_connection_reused)
+
+        old_session = self.session
+        self.session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+        if old_session and not old_session.closed:
+            await old_session.close()
+
+    async def get_http_session(self) -> aiohttp.ClientSession:
+        """Gibt die gemeinsame Session zurück und öffnet sie bei Bedarf neu."""
+        if self.session is None or self.session.closed:
+            await self.open_http_session()
+        return self.session
+
+    async def _trace_request_start(self, session, trace_config_ctx, params):
+        self.pool_stats["requests"] += 1
+
+    async def _trace_connection_created(self, session, trace_config_ctx, params):
+        self.pool_stats["connections_created"] += 1
+
+    async def _trace_connection_reused(self, session, trace_config_ctx, params):
+        self.pool_stats["connections_reused"] += 1
 
     async def send_error_embed(self, ctx, description):
         embed = discord.Embed(
@@ -96,6 +238,96 @@ class API(commands.Cog):
             inline=False
         )
 
+        embed.add_field(
+            name="!setpollparallel",
+            value="`!setpollparallel [anzahl]`\nSetzt, wie viele Instanzen gleichzeitig abgefragt werden.",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!setpolltimeout",
+            value="`!setpolltimeout [sekunden]`\nSetzt das Zeitlimit pro Instanzabfrage.",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!setpoolsize",
+            value="`!setpoolsize [gesamt] [pro_host]`\nSetzt die Größe des HTTP-Verbindungspools.",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!apipool",
+            value="`!apipool`\nZeigt Statistiken zur Wiederverwendung der HTTP-Verbindungen.",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!setsessionttl",
+            value="`!setsessionttl [sekunden]`\nSetzt, wie lange eine AMP-Session wiederverwendet wird.",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!setheartbeat",
+            value="`!setheartbeat [minuten]`\nErzwingt eine Aktualisierung unveränderter Statusnachrichten (0 = aus).",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!setpollintervals",
+            value="`!setpollintervals [min] [normal] [max]`\nSetzt die Abfrageintervalle pro Controller in Sekunden.",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!setbreaker",
+            value="`!setbreaker [fehler] [sekunden]`\nSetzt, wann ein Controller als offline gilt und wann er erneut geprüft wird.",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!setboardmode",
+            value="`!setboardmode [on/off]`\nZeigt alle Instanzen kompakt in wenigen Nachrichten (max. 10 pro Nachricht).",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!apistats",
+            value="`!apistats`\nZeigt Latenzen, Fehlerursachen und Zyklusdauer der AMP-Abfragen.",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!setmetricsdump",
+            value="`!setmetricsdump [off/json/prometheus]`\nSchreibt die Metriken regelmäßig in eine Datei.",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!instancestatus",
+            value="`!instancestatus [instance_id]`\nZeigt den zuletzt abgefragten Status einer Instanz sofort an.",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!setstatusfreshness",
+            value="`!setstatusfreshness [sekunden]`\nSetzt, ab welchem Alter !instancestatus neu abfragt.",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!instanceuptime",
+            value="`!instanceuptime [instance_id] [zeitraum]`\nZeigt die Verfügbarkeit einer Instanz, z.B. für `24h`, `7d` oder `30d`.",
+            inline=False
+        )
+
+        embed.add_field(
+            name="!instanceplayers",
+            value="`!instanceplayers [instance_id] [zeitraum]`\nZeigt Spitzen- und Durchschnittsspielerzahl einer Instanz.",
+            inline=False
+        )
+
         await ctx.send(embed=embed)
 
     @commands.command()
@@ -139,8 +371,7 @@ class API(commands.Cog):
                 message_id = instances[instance_id].get("message_id")
                 if message_id:
                     try:
-                        message = await channel.fetch_message(message_id)
-                        await message.delete()
+                        await channel.get_partial_message(message_id).delete()
                     except discord.NotFound:
                         pass
                     except discord.HTTPException as e:
@@ -148,6 +379,9 @@ class API(commands.Cog):
 
             del instances[instance_id]
             await self.config.instances.set(instances)
+            self.embed_fingerprints.pop(instance_id, None)
+            self.timeseries.delete(instance_id)
+            self.last_status.pop(instance_id, None)
             await ctx.send(f"✅ Instanz `{instance_id}` wurde entfernt.")
         except Exception as e:
             log.error(f"removeinstance: {e}")
@@ -170,7 +404,10 @@ class API(commands.Cog):
             for instance_id, info in instances.items():
                 embed.add_field(
                     name=f"{info['name']} ({instance_id})",
-                    value=f"IP: {info['ip']}\nBeschreibung: {info['description']}",
+                    value=(
+                        f"IP: {info['ip']}\nBeschreibung: {info['description']}\n"
+                        f"Controller: {self.breaker_status_text(info['api_url'])}"
+                    ),
                     inline=False
                 )
                 count += 1
@@ -195,6 +432,9 @@ class API(commands.Cog):
                 await ctx.send("Instanz-ID nicht gefunden.")
                 return
             if field in instances[instance_id]:
+                if field in ("api_url", "username", "password"):
+                    old = instances[instance_id]
+                    self.invalidate_amp_session(old["api_url"], old["username"])
                 instances[instance_id][field] = value
                 await self.config.instances.set(instances)
                 await ctx.send(f"{field} aktualisiert für Instanz '{instance_id}'.")
@@ -209,7 +449,7 @@ class API(commands.Cog):
     async def updateinstances(self, ctx):
         try:
             await ctx.send("🔄 Aktualisiere alle Instanzen...")
-            await self.status_updater()
+            await self.status_updater(force=True)
             await ctx.send("✅ Instanzen wurden aktualisiert!")
         except Exception as e:
             log.error(f"updateinstances: {e}")
@@ -225,101 +465,670 @@ class API(commands.Cog):
             log.error(f"setstatuschannel: {e}")
             await self.send_error_embed(ctx, f"Fehler beim Setzen des Kanals: {e}")
 
+    async def query_history(self, ctx, instance_id: str, duration: str):
+        """Gemeinsame Auswertung für instanceuptime und instanceplayers."""
+        instances = await self.config.instances()
+        if instance_id not in instances:
+            await ctx.send("❌ Instanz-ID nicht gefunden.")
+            return None
+        seconds = min(parse_duration(duration), TIERS[-1][2])
+        now = time.time()
+        total_seconds, up_seconds, player_seconds, player_max = self.timeseries.query(instance_id, now - seconds, now)
+        if not total_seconds:
+            await ctx.send(f"ℹ️ Keine Daten für `{instances[instance_id]['name']}` im Zeitraum {duration}.")
+            return None
+        return instances[instance_id], total_seconds, up_seconds, player_seconds, player_max
+
+    @commands.command()
+    async def instancestatus(self, ctx, instance_id: str):
+        """Zeigt den zuletzt abgefragten Status einer Instanz; fragt nur bei veralteten Daten neu ab."""
+        instances = await self.config.instances()
+        if instance_id not in instances:
+            await ctx.send("❌ Instanz-ID nicht gefunden.")
+            return
+
+        freshness = await self.config.status_freshness()
+        cached = self.last_status.get(instance_id)
+        if cached is None or time.time() - cached[2] > freshness:
+            await self.refresh_instance(instance_id)
+            cached = self.last_status.get(instance_id)
+        if cached is None:
+            await ctx.send("ℹ️ Für diese Instanz liegen noch keine Daten vor.")
+            return
+
+        status, error, polled_at = cached
+        embed = self.build_status_embed(instances[instance_id], status, error)
+        embed.timestamp = datetime.fromtimestamp(polled_at, tz=timezone.utc)
+        embed.add_field(name="🕒 Stand", value=f"<t:{int(polled_at)}:R>", inline=True)
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    async def instanceuptime(self, ctx, instance_id: str, duration: str = "7d"):
+        """Zeigt die Verfügbarkeit einer Instanz im angegebenen Zeitraum (z.B. 24h, 7d, 30d)."""
+        result = await self.query_history(ctx, instance_id, duration)
+        if result is None:
+            return
+        info, total_seconds, up_seconds, _player_seconds, _player_max = result
+        await ctx.send(
+            f"📈 **{info['name']}** – Verfügbarkeit ({duration}): **{up_seconds / total_seconds * 100:.1f}%** "
+            f"({up_seconds / 3600:.1f}h von {total_seconds / 3600:.1f}h erfasst online)"
+        )
+
+    @commands.command()
+    async def instanceplayers(self, ctx, instance_id: str, duration: str = "7d"):
+        """Zeigt Spitzen- und Durchschnittsspielerzahl einer Instanz im angegebenen Zeitraum."""
+        result = await self.query_history(ctx, instance_id, duration)
+        if result is None:
+            return
+        info, _total_seconds, up_seconds, player_seconds, player_max = result
+        average = player_seconds / up_seconds if up_seconds else 0  # Zeitgewichtet
+        await ctx.send(
+            f"👥 **{info['name']}** – Spieler ({duration}): Spitze **{player_max}**, "
+            f"Durchschnitt **{average:.1f}** (während online)"
+        )
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def setpollparallel(self, ctx, max_parallel: int):
+        """Setzt, wie viele Instanzen gleichzeitig abgefragt werden."""
+        if max_parallel < 1:
+            await ctx.send("❌ Der Wert muss mindestens 1 sein.")
+            return
+        await self.config.max_parallel.set(max_parallel)
+        await ctx.send(f"✅ Es werden nun bis zu {max_parallel} Instanzen gleichzeitig abgefragt.")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def setpolltimeout(self, ctx, seconds: int):
+        """Setzt das Zeitlimit pro Instanzabfrage in Sekunden."""
+        if seconds < 1:
+            await ctx.send("❌ Das Zeitlimit muss mindestens 1 Sekunde betragen.")
+            return
+        await self.config.poll_timeout.set(seconds)
+        await ctx.send(f"✅ Zeitlimit pro Instanz auf {seconds}s gesetzt.")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def setpoolsize(self, ctx, limit: int, limit_per_host: int):
+        """Setzt die Größe des HTTP-Verbindungspools (gesamt und pro AMP-Host)."""
+        if limit < 1 or limit_per_host < 1:
+            await ctx.send("❌ Beide Werte müssen mindestens 1 sein.")
+            return
+        await self.config.pool_limit.set(limit)
+        await self.config.pool_limit_per_host.set(limit_per_host)
+        # Neue Session mit neuem Pool; laufende Anfragen der alten Session schlagen einmalig fehl.
+        await self.open_http_session()
+        await ctx.send(f"✅ Verbindungspool gesetzt: {limit} gesamt, {limit_per_host} pro Host.")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def setsessionttl(self, ctx, seconds: int):
+        """Setzt, wie lange eine AMP-Session-ID wiederverwendet wird."""
+        if seconds < 0:
+            await ctx.send("❌ Die Dauer darf nicht negativ sein.")
+            return
+        await self.config.session_ttl.set(seconds)
+        self.amp_sessions.clear()
+        await ctx.send(f"✅ AMP-Sessions werden nun {seconds}s wiederverwendet.")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def setheartbeat(self, ctx, minutes: int):
+        """Setzt, nach wie vielen Minuten unveränderte Statusnachrichten trotzdem neu geschrieben werden."""
+        if minutes < 0:
+            await ctx.send("❌ Der Wert darf nicht negativ sein.")
+            return
+        await self.config.heartbeat_minutes.set(minutes)
+        if minutes:
+            await ctx.send(f"✅ Unveränderte Statusnachrichten werden spätestens alle {minutes} Minuten aktualisiert.")
+        else:
+            await ctx.send("✅ Statusnachrichten werden nur noch bei Änderungen aktualisiert.")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def setpollintervals(self, ctx, min_seconds: int, base_seconds: int, max_seconds: int):
+        """Setzt Mindest-, Normal- und Höchstintervall der Controller-Abfragen in Sekunden."""
+        if not SCHEDULER_TICK_SECONDS <= min_seconds <= base_seconds <= max_seconds:
+            await ctx.send(f"❌ Es muss gelten: {SCHEDULER_TICK_SECONDS} ≤ Minimum ≤ Normal ≤ Maximum.")
+            return
+        await self.config.min_poll_interval.set(min_seconds)
+        await self.config.poll_interval.set(base_seconds)
+        await self.config.max_poll_interval.set(max_seconds)
+        await ctx.send(f"✅ Abfrageintervalle gesetzt: min. {min_seconds}s, normal {base_seconds}s, max. {max_seconds}s.")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def setbreaker(self, ctx, threshold: int, cooldown_seconds: int):
+        """Setzt, nach wie vielen Fehlern ein Controller als offline gilt und wann er erneut geprüft wird."""
+        if threshold < 1 or cooldown_seconds < 1:
+            await ctx.send("❌ Beide Werte müssen mindestens 1 sein.")
+            return
+        await self.config.breaker_threshold.set(threshold)
+        await self.config.breaker_cooldown.set(cooldown_seconds)
+        await ctx.send(
+            f"✅ Controller gelten nach {threshold} Fehlern in Folge als offline "
+            f"und werden alle {cooldown_seconds}s erneut geprüft."
+        )
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def setstatusfreshness(self, ctx, seconds: int):
+        """Setzt, ab welchem Alter !instancestatus den Status neu abfragt."""
+        if seconds < 0:
+            await ctx.send("❌ Der Wert darf nicht negativ sein.")
+            return
+        await self.config.status_freshness.set(seconds)
+        await ctx.send(f"✅ !instancestatus fragt nun ab einem Alter von {seconds}s neu ab.")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def setboardmode(self, ctx, enabled: bool):
+        """Schaltet zwischen einer Nachricht pro Instanz und dem kompakten Board um."""
+        try:
+            if enabled == await self.config.board_mode():
+                await ctx.send(f"ℹ️ Der Board-Modus ist bereits {'aktiv' if enabled else 'inaktiv'}.")
+                return
+
+            async with self.poll_lock:
+                channel = self.bot.get_channel(await self.config.channel_id())
+                if enabled:
+                    # Alte Einzelnachrichten entfernen
+                    async with self.config.instances() as instances:
+                        old_ids = [info.get("message_id") for info in instances.values()]
+                        for info in instances.values():
+                            info["message_id"] = 0
+                else:
+                    old_ids = await self.config.board_message_ids()
+                    await self.config.board_message_ids.set([])
+                if channel:
+                    await self.delete_status_messages(channel, old_ids)
+                self.embed_fingerprints.clear()
+                await self.config.board_mode.set(enabled)
+
+            await self.status_updater(force=True)
+            await ctx.send(f"✅ Board-Modus {'aktiviert' if enabled else 'deaktiviert'}.")
+        except Exception as e:
+            log.error(f"setboardmode: {e}")
+            await self.send_error_embed(ctx, f"Fehler beim Umschalten des Board-Modus: {e}")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def setmetricsdump(self, ctx, dump_format: str):
+        """Legt fest, ob Metriken als Datei geschrieben werden (off, json, prometheus)."""
+        dump_format = dump_format.lower()
+        if dump_format not in ("off", "json", "prometheus"):
+            await ctx.send("❌ Erlaubt sind `off`, `json` oder `prometheus`.")
+            return
+        await self.config.metrics_dump.set(dump_format)
+        await ctx.send(f"✅ Metrik-Export: {dump_format}.")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def apistats(self, ctx):
+        """Zeigt Latenzen, Fehlerursachen und Zyklusdauer der AMP-Abfragen."""
+        embed = discord.Embed(title="📊 AMP-Abfragestatistik", color=0x3498db)
+
+        stage_lines = []
+        for stage, histogram in sorted(self.metrics.histograms.items()):
+            stage_lines.append(
+                f"`{stage}`: {histogram.count}× | Ø {histogram.average * 1000:.0f} ms | "
+                f"p95 ≤ {histogram.quantile(0.95) * 1000:.0f} ms | max {histogram.max * 1000:.0f} ms"
+            )
+        embed.add_field(name="⏱️ Latenzen", value="\n".join(stage_lines) or "Noch keine Messungen.", inline=False)
+
+        error_lines = [f"`{cause}`: {count}" for cause, count in sorted(self.metrics.errors.items())]
+        embed.add_field(name="❗ Fehler nach Ursache", value="\n".join(error_lines) or "Keine Fehler.", inline=False)
+
+        cycle = self.metrics.histograms.get("cycle")
+        if cycle:
+            cycle_text = (
+                f"Letzter: {cycle.last:.1f}s | Ø {cycle.average:.1f}s | max {cycle.max:.1f}s\n"
+                f"Länger als das Tick-Intervall ({SCHEDULER_TICK_SECONDS}s): {self.metrics.cycle_overruns}× von {cycle.count}"
+            )
+        else:
+            cycle_text = "Noch kein Zyklus gelaufen."
+        embed.add_field(name="🔁 Zyklen", value=cycle_text, inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def apipool(self, ctx):
+        """Zeigt Statistiken zur Wiederverwendung der HTTP-Verbindungen."""
+        limit = await self.config.pool_limit()
+        limit_per_host = await self.config.pool_limit_per_host()
+        created = self.pool_stats["connections_created"]
+        reused = self.pool_stats["connections_reused"]
+        total = created + reused
+        reuse_rate = (reused / total * 100) if total else 0
+
+        embed = discord.Embed(title="🔌 HTTP-Verbindungspool", color=0x3498db)
+        embed.add_field(name="Limits", value=f"{limit} gesamt / {limit_per_host} pro Host", inline=False)
+        embed.add_field(name="Anfragen", value=str(self.pool_stats["requests"]), inline=True)
+        embed.add_field(name="Neue Verbindungen", value=str(created), inline=True)
+        embed.add_field(name="Wiederverwendet", value=f"{reused} ({reuse_rate:.1f}%)", inline=True)
+        embed.add_field(name="Gecachte AMP-Sessions", value=str(len(self.amp_sessions)), inline=True)
+        await ctx.send(embed=embed)
+
     async def login_amp(self, api_url: str, username: str, password: str):
         login_endpoint = f"{api_url}API/Core/Login"
         login_data = {"username": username, "password": password, "token": "", "rememberMe": False}
         headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
-        async with aiohttp.ClientSession() as session:
-            try:
+        session = await self.get_http_session()
+        try:
+            with self.metrics.time("login"):
                 async with session.post(login_endpoint, json=login_data, headers=headers, timeout=10) as response:
                     data = await response.json()
-                    if data.get("success"):
-                        return data.get("sessionID"), None
-                    return None, f"Login fehlgeschlagen: {data.get('message', 'Unbekannter Fehler')}"
-            except Exception as e:
-                return None, f"Fehler bei der Anmeldung: {e}"
+            if data.get("success"):
+                return data.get("sessionID"), None
+            self.metrics.error("login")
+            return None, f"Login fehlgeschlagen: {data.get('message', 'Unbekannter Fehler')}"
+        except asyncio.TimeoutError:
+            self.metrics.error("timeout")
+            return None, "Timeout bei der Anmeldung."
+        except Exception as e:
+            self.metrics.error("other")
+            return None, f"Fehler bei der Anmeldung: {e}"
 
-    async def fetch_amp_instance_status(self, instance_id: str, instance_info: dict):
-        try:
-            session_id, error = await self.login_amp(instance_info["api_url"], instance_info["username"], instance_info["password"])
+    async def get_amp_session(self, api_url: str, username: str, password: str):
+        """Liefert eine gecachte Session-ID oder meldet sich (einmalig für alle Aufrufer) neu an."""
+        key = (api_url, username)
+        cached = self.amp_sessions.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0], None
+
+        # Laufenden Login mitbenutzen, statt parallel einen weiteren zu starten
+        login_task = self.amp_logins.get(key)
+        if login_task is None:
+            login_task = asyncio.ensure_future(self._login_and_cache(key, api_url, username, password))
+            self.amp_logins[key] = login_task
+            login_task.add_done_callback(lambda task: self._forget_login_task(key, task))
+        # shield: Ein abgebrochener Aufrufer (z.B. Zeitlimit) bricht den gemeinsamen Login nicht ab
+        return await asyncio.shield(login_task)
+
+    async def _login_and_cache(self, key, api_url: str, username: str, password: str):
+        session_id, error = await self.login_amp(api_url, username, password)
+        if session_id:
+            ttl = await self.config.session_ttl()
+            self.amp_sessions[key] = (session_id, time.monotonic() + ttl)
+        return session_id, error
+
+    def _forget_login_task(self, key, task):
+        if self.amp_logins.get(key) is task:
+            del self.amp_logins[key]
+
+    def invalidate_amp_session(self, api_url: str, username: str, session_id: str = None):
+        """Verwirft die gecachte Session (nur wenn sie noch die abgelehnte ist, falls angegeben)."""
+        key = (api_url, username)
+        cached = self.amp_sessions.get(key)
+        if cached and (session_id is None or cached[0] == session_id):
+            del self.amp_sessions[key]
+
+    @staticmethod
+    def is_session_rejected(status: int, data) -> bool:
+        """Erkennt, ob AMP die Session-ID nicht (mehr) akzeptiert."""
+        if status in (401, 403):
+            return True
+        return isinstance(data, dict) and data.get("Title") == "Unauthorized Access"
+
+    async def amp_request(self, api_url: str, username: str, password: str, endpoint: str, payload: dict = None):
+        """Sendet eine authentifizierte Anfrage an AMP und meldet sich bei abgelehnter Session einmal neu an."""
+        # Höchstens ein erneuter Versuch, falls AMP die gecachte Session ablehnt
+        for _attempt in range(2):
+            session_id, error = await self.get_amp_session(api_url, username, password)
             if error:
                 return None, error
 
-            status_endpoint = f"{instance_info['api_url']}API/ADSModule/GetInstance"
-            payload = {"SESSIONID": session_id, "InstanceId": instance_id}
+            body = dict(payload or {}, SESSIONID=session_id)
             headers = {'Accept': 'application/json'}
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(status_endpoint, json=payload, headers=headers, timeout=10) as response:
+            session = await self.get_http_session()
+            # Stufenname für die Metriken, z.B. "GetInstances"
+            with self.metrics.time(endpoint.rsplit("/", 1)[-1]):
+                async with session.post(f"{api_url}{endpoint}", json=body, headers=headers, timeout=10) as response:
                     if "text/html" in response.headers.get("Content-Type", ""):
+                        self.metrics.error("html")
                         return None, "Fehler: API hat HTML statt JSON zurückgegeben."
 
+                    if self.is_session_rejected(response.status, None):
+                        self.metrics.error("session_rejected")
+                        self.invalidate_amp_session(api_url, username, session_id)
+                        continue
+
                     if response.status != 200:
+                        self.metrics.error("http_status")
                         return None, f"API-Fehler {response.status}"
 
                     data = await response.json()
-                    if not data or "Running" not in data or data.get("AppState", 0) != 20:
-                        return None, "Keine gültige Antwort erhalten."
+                    if self.is_session_rejected(response.status, data):
+                        self.metrics.error("session_rejected")
+                        self.invalidate_amp_session(api_url, username, session_id)
+                        continue
                     return data, None
+        return None, "AMP hat die Sitzung auch nach erneutem Login abgelehnt."
+
+    def evaluate_instance_status(self, data):
+        """Prüft die Statusdaten einer einzelnen Instanz auf Gültigkeit."""
+        if not data or "Running" not in data or data.get("AppState", 0) != 20:
+            self.metrics.error("bad_appstate")
+            return None, "Keine gültige Antwort erhalten."
+        return data, None
+
+    async def fetch_controller_statuses(self, api_url: str, username: str, password: str):
+        """Holt die Statusdaten aller Instanzen eines ADS-Controllers mit einer einzigen Anfrage."""
+        try:
+            data, error = await self.amp_request(api_url, username, password, "API/ADSModule/GetInstances")
+            if error:
+                return None, error
+            return extract_instance_statuses(data), None
         except asyncio.TimeoutError:
+            self.metrics.error("timeout")
             return None, "Timeout bei der Anfrage."
         except Exception as e:
-            return None, f"Fehler beim Abrufen des Status: {e}"
+            self.metrics.error("other")
+            return None, f"Fehler beim Abrufen der Instanzliste: {e}"
 
-    @tasks.loop(minutes=2)
-    async def status_updater(self):
-        log.info("Starte Status-Update...")
-        instances = await self.config.instances()
-        channel_id = await self.config.channel_id()
+    def get_breaker(self, api_url: str, threshold: int, cooldown: float) -> CircuitBreaker:
+        """Liefert den Circuit Breaker eines Controllers mit den aktuellen Einstellungen."""
+        breaker = self.breakers.get(api_url)
+        if breaker is None:
+            breaker = self.breakers[api_url] = CircuitBreaker(threshold, cooldown)
+        breaker.threshold = threshold
+        breaker.cooldown = cooldown
+        return breaker
 
-        channel = self.bot.get_channel(channel_id)
-        if not channel:
-            log.error("Kanal nicht gefunden!")
-            return
+    def breaker_status_text(self, api_url: str) -> str:
+        breaker = self.breakers.get(api_url)
+        if breaker is None or breaker.state == CircuitBreaker.CLOSED:
+            return "🟢 erreichbar"
+        if breaker.state == CircuitBreaker.HALF_OPEN:
+            return "🟡 Probeanfrage läuft"
+        return f"🔴 offline (nächste Probe in {breaker.remaining_cooldown(time.monotonic()):.0f}s)"
 
-        for instance_id, info in instances.items():
-            status, error = await self.fetch_amp_instance_status(instance_id, info)
-            if error or not status:
-                status_text = f"❌ läuft nicht (Fehler: {error})"
-                embed_color = 0xff0000
-                player_count = "N/A"
+    async def poll_controller(self, semaphore: asyncio.Semaphore, instances: dict, instance_ids: list,
+                              timeout: float, breaker: CircuitBreaker):
+        """Fragt alle Instanzen eines Controllers gesammelt ab, begrenzt durch Semaphor und Zeitlimit.
+
+        Gibt (controller_schlüssel, [(instance_id, status, fehler)], controller_fehler) zurück;
+        controller_fehler ist nur bei Transport- oder Controller-Fehlern gesetzt.
+        """
+        info = instances[instance_ids[0]]
+        if not breaker.allow(time.monotonic()):
+            # Controller gilt als offline: sofort antworten, ohne Login- und Status-Timeouts abzuwarten
+            self.metrics.error("breaker_open")
+            statuses, error = None, f"Controller nicht erreichbar ({breaker.last_error})"
+        else:
+            async with semaphore:
+                try:
+                    statuses, error = await asyncio.wait_for(
+                        self.fetch_controller_statuses(info["api_url"], info["username"], info["password"]),
+                        timeout=timeout
+                    )
+                except asyncio.TimeoutError:
+                    self.metrics.error("timeout")
+                    statuses, error = None, f"Zeitlimit von {timeout}s überschritten."
+            if error:
+                breaker.record_failure(time.monotonic(), error)
+                if breaker.state == CircuitBreaker.OPEN:
+                    log.warning(f"Controller {info['api_url']} gilt als offline: {error}")
             else:
-                running = status.get("Running", False)
-                player_count = status.get("Metrics", {}).get("Active Users", {}).get("RawValue", "0")
-                status_text = "✅ läuft" if running else "❌ läuft nicht"
-                embed_color = 0x00ff00 if running else 0xff0000
+                breaker.record_success()
+
+        results = []
+        for instance_id in instance_ids:
+            if error:
+                results.append((instance_id, None, error))
+            elif instance_id not in statuses:
+                self.metrics.error("not_found")
+                results.append((instance_id, None, "Instanz nicht in der Instanzliste des Controllers gefunden."))
+            else:
+                results.append((instance_id, *self.evaluate_instance_status(statuses[instance_id])))
+        return (info["api_url"], info["username"]), results, error
+
+    def build_status_embed(self, info: dict, status, error) -> discord.Embed:
+        """Baut das Status-Embed einer Instanz aus dem Abfrageergebnis."""
+        if error or not status:
+            status_text = f"❌ läuft nicht (Fehler: {error})"
+            embed_color = 0xff0000
+            player_count = "N/A"
+        else:
+            running = status.get("Running", False)
+            player_count = status.get("Metrics", {}).get("Active Users", {}).get("RawValue", "0")
+            status_text = "✅ läuft" if running else "❌ läuft nicht"
+            embed_color = 0x00ff00 if running else 0xff0000
 
-            embed = discord.Embed(
+        embed = discord.Embed(
             title=f"🎮 {info['name']}",
             color=embed_color
-            )
-            embed.add_field(name="📝 Beschreibung", value=info["description"], inline=False)
-            embed.add_field(name="🌐 IP-Adresse", value=f"`{info['ip']}`", inline=False)
+        )
+        embed.add_field(name="📝 Beschreibung", value=info["description"], inline=False)
+        embed.add_field(name="🌐 IP-Adresse", value=f"`{info['ip']}`", inline=False)
 
-            steamlink = info["steamlink"] or None
-            if steamlink:
-                embed.add_field(name="🔗 Steam Joinlink", value=f"[Hier klicken]({steamlink})", inline=False)
-            else:
-                embed.add_field(name="🔗 Steam Joinlink", value="Kein Link angegeben", inline=False)
+        steamlink = info["steamlink"] or None
+        if steamlink:
+            embed.add_field(name="🔗 Steam Joinlink", value=f"[Hier klicken]({steamlink})", inline=False)
+        else:
+            embed.add_field(name="🔗 Steam Joinlink", value="Kein Link angegeben", inline=False)
 
-            embed.add_field(name="📡 Status", value=("🟢 läuft" if status_text.startswith("✅") else "🔴 offline"), inline=True)
-            embed.add_field(name="👥 Spielerzahl", value=player_count, inline=True)
+        embed.add_field(name="📡 Status", value=("🟢 läuft" if status_text.startswith("✅") else "🔴 offline"), inline=True)
+        embed.add_field(name="👥 Spielerzahl", value=player_count, inline=True)
 
-            embed.set_footer(text="Powered by Hossa INC")
-            embed.timestamp = discord.utils.utcnow()
+        embed.set_footer(text="Powered by Hossa INC")
+        embed.timestamp = discord.utils.utcnow()
+        return embed
 
+    def needs_edit(self, key: str, message_id: int, fingerprint: str, heartbeat: float) -> bool:
+        """Prüft, ob sich der Embed-Inhalt geändert hat oder der Heartbeat fällig ist."""
+        previous = self.embed_fingerprints.get(key)
+        if previous is None or previous[0] != fingerprint or previous[1] != message_id:
+            return True
+        return bool(heartbeat) and time.monotonic() - previous[2] >= heartbeat
+
+    async def update_status_message(self, channel, message_id: int, embeds: list) -> int:
+        """Bearbeitet eine Statusnachricht ohne vorheriges fetch_message; sendet nur neu, wenn sie fehlt.
+
+        Gibt die (ggf. neue) message_id zurück.
+        """
+        if message_id:
             try:
-                message = await channel.fetch_message(info["message_id"])
-                await message.edit(embed=embed)
+                await channel.get_partial_message(message_id).edit(embeds=embeds)
+                return message_id
             except discord.NotFound:
-                msg = await channel.send(embed=embed)
-                instances[instance_id]["message_id"] = msg.id
-                await self.config.instances.set(instances)
+                pass
+        msg = await channel.send(embeds=embeds)
+        return msg.id
+
+    async def delete_status_messages(self, channel, message_ids):
+        """Löscht alte Status- oder Board-Nachrichten; bereits gelöschte werden übersprungen."""
+        for message_id in message_ids:
+            if not message_id:
+                continue
+            try:
+                await channel.get_partial_message(message_id).delete()
+            except discord.NotFound:
+                pass
             except discord.HTTPException as e:
-                log.error(f"Fehler beim Aktualisieren der Nachricht: {e}")
-                msg = await channel.send(embed=embed)
-                instances[instance_id]["message_id"] = msg.id
-                await self.config.instances.set(instances)
+                log.error(f"Fehler beim Löschen der Statusnachricht: {e}")
+
+    async def update_board(self, channel, instances: dict, force: bool, heartbeat: float):
+        """Rendert alle Instanzen aus dem Status-Cache in einem Rutsch auf die Board-Nachrichten."""
+        board_ids = await self.config.board_message_ids()
+        embeds = []
+        for instance_id, info in instances.items():
+            status, error, _polled_at = self.last_status.get(instance_id, (None, "Noch nicht abgefragt.", 0))
+            embeds.append(self.build_status_embed(info, status, error))
+        pages = pack_embeds(embeds)
+
+        new_ids = []
+        for index, page in enumerate(pages):
+            key = f"board:{index}"
+            message_id = board_ids[index] if index < len(board_ids) else 0
+            fingerprint = hashlib.sha1("".join(embed_fingerprint(e) for e in page).encode("utf-8")).hexdigest()
+            if not force and not self.needs_edit(key, message_id, fingerprint, heartbeat):
+                new_ids.append(message_id)
+                continue
+            try:
+                with self.metrics.time("discord_edit"):
+                    message_id = await self.update_status_message(channel, message_id, page)
+            except discord.HTTPException as e:
+                self.metrics.error("discord")
+                log.error(f"Board-Nachricht {index + 1} konnte nicht aktualisiert werden: {e}")
+                new_ids.append(message_id)
+                continue
+            self.embed_fingerprints[key] = (fingerprint, message_id, time.monotonic())
+            new_ids.append(message_id)
+
+        # Überzählige Board-Nachrichten (z.B. nach dem Entfernen von Instanzen) aufräumen
+        stale_ids = board_ids[len(pages):]
+        await self.delete_status_messages(channel, stale_ids)
+        for index in range(len(pages), len(board_ids)):
+            self.embed_fingerprints.pop(f"board:{index}", None)
+        if new_ids != board_ids:
+            with self.metrics.time("config_write"):
+                await self.config.board_message_ids.set(new_ids)
+
+    @staticmethod
+    def status_state_key(status, error):
+        """Kurzer Zustandsschlüssel eines Ergebnisses, um Änderungen zu erkennen."""
+        if error or not status:
+            return ("error",)
+        player_count = status.get("Metrics", {}).get("Active Users", {}).get("RawValue", "0")
+        return ("ok", status.get("Running", False), str(player_count))
+
+    @tasks.loop(seconds=SCHEDULER_TICK_SECONDS)
+    async def status_updater(self, force: bool = False):
+        async with self.poll_lock:
+            instances = await self.config.instances()
+            channel_id = await self.config.channel_id()
+
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                log.error("Kanal nicht gefunden!")
+                return
+
+            now = time.monotonic()
+            groups = group_instances_by_controller(instances)
+            self.scheduler.sync(groups.keys(), now)
+            # force (!updateinstances): vollständiger Durchlauf unabhängig vom Plan
+            due_keys = list(groups) if force else self.scheduler.pop_due(now)
+            due_ids = [instance_id for key in due_keys for instance_id in groups.get(key, [])]
+            if not due_ids:
+                return
+            log.info(f"Starte Status-Update für {len(due_ids)} Instanz(en) auf {len(due_keys)} Controller(n)...")
+            cycle_start = time.perf_counter()
+            await self.poll_and_update(channel, instances, due_ids, force)
+            self.metrics.record_cycle(time.perf_counter() - cycle_start, SCHEDULER_TICK_SECONDS)
+            await self.dump_metrics()
+
+    async def dump_metrics(self):
+        """Schreibt die Metriken optional als JSON- oder Prometheus-Textdatei unter cog_data_path."""
+        dump_format = await self.config.metrics_dump()
+        if dump_format == "off":
+            return
+        if dump_format == "json":
+            path = cog_data_path(self) / "metrics.json"
+            content = json.dumps(self.metrics.to_json(), indent=2)
+        else:
+            path = cog_data_path(self) / "metrics.prom"
+            content = self.metrics.to_prometheus()
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        try:
+            tmp_path.write_text(content, encoding="utf-8")
+            tmp_path.replace(path)
+        except OSError as e:
+            log.error(f"Metriken konnten nicht geschrieben werden: {e}")
+
+    async def refresh_instance(self, instance_id: str):
+        """Fragt eine einzelne Instanz sofort ab (inkl. Aktualisierung ihrer Statusnachricht)."""
+        async with self.poll_lock:
+            instances = await self.config.instances()
+            if instance_id not in instances:
+                return
+            channel = self.bot.get_channel(await self.config.channel_id())
+            await self.poll_and_update(channel, instances, [instance_id])
+
+    async def poll_and_update(self, channel, instances: dict, due_ids: list, force: bool = False):
+        """Fragt die Controller der angegebenen Instanzen ab, aktualisiert die Nachrichten und plant neu ein.
+
+        Da jede Abfrage ohnehin den Status aller Instanzen eines Controllers liefert, werden immer
+        alle Instanzen der betroffenen Controller übernommen, nicht nur die angegebenen.
+        Ohne Kanal (`channel` ist None) werden nur Cache, Zeitreihe und Plan aktualisiert.
+        """
+        max_parallel = max(1, await self.config.max_parallel())
+        poll_timeout = await self.config.poll_timeout()
+        semaphore = asyncio.Semaphore(max_parallel)
+        heartbeat = await self.config.heartbeat_minutes() * 60
+        base_interval = await self.config.poll_interval()
+        min_interval = await self.config.min_poll_interval()
+        max_interval = await self.config.max_poll_interval()
+        breaker_threshold = await self.config.breaker_threshold()
+        breaker_cooldown = await self.config.breaker_cooldown()
+        board_mode = await self.config.board_mode()
+
+        # Eine Sammelabfrage pro Controller, alle Controller gleichzeitig (max. max_parallel
+        # auf einmal); die Ergebnisse werden in der Reihenfolge ihres Eintreffens übernommen.
+        due_ids = set(due_ids)
+        pending = [
+            self.poll_controller(
+                semaphore, instances, instance_ids, poll_timeout,
+                self.get_breaker(api_url, breaker_threshold, breaker_cooldown)
+            )
+            for (api_url, _username), instance_ids in group_instances_by_controller(instances).items()
+            if due_ids.intersection(instance_ids)
+        ]
+        message_id_updates = {}
+        for next_results in asyncio.as_completed(pending):
+            controller_key, results, controller_error = await next_results
+            # Nur Transport-/Controller-Fehler verlängern das Intervall, gestoppte Instanzen nicht
+            state_key = None if controller_error else tuple(
+                (instance_id, self.status_state_key(status, error)) for instance_id, status, error in results
+            )
+            now = time.monotonic()
+            self.scheduler.record(
+                controller_key, state_key, bool(controller_error), now, base_interval, min_interval, max_interval
+            )
+            # Bei offenem Breaker nicht länger als bis zur Probeanfrage warten, trotz Backoff
+            breaker = self.breakers.get(controller_key[0])
+            if breaker is not None and breaker.state == CircuitBreaker.OPEN:
+                self.scheduler.cap_due(controller_key, now + breaker.remaining_cooldown(now))
+            for instance_id, status, error in results:
+                polled_at = time.time()
+                # Abgedeckte Zeit: seit der letzten Abfrage, höchstens max_poll_interval (z.B. nach Ausfällen des Bots)
+                previous = self.last_status.get(instance_id)
+                covered = min(polled_at - previous[2], max_interval) if previous else base_interval
+                up = not error and bool(status) and status.get("Running", False)
+                self.timeseries.add(instance_id, polled_at, covered, up, player_count_of(status) if up else 0)
+                self.last_status[instance_id] = (status, error, polled_at)
+                if channel is None or board_mode:
+                    continue
+
+                embed = self.build_status_embed(instances[instance_id], status, error)
+                fingerprint = embed_fingerprint(embed)
+                # Unveränderte Embeds nicht erneut an Discord schicken
+                if not force and not self.needs_edit(instance_id, instances[instance_id]["message_id"], fingerprint, heartbeat):
+                    continue
+                try:
+                    with self.metrics.time("discord_edit"):
+                        message_id = await self.update_status_message(channel, instances[instance_id]["message_id"], [embed])
+                except discord.HTTPException as e:
+                    self.metrics.error("discord")
+                    log.error(f"Statusnachricht für {instance_id} konnte nicht aktualisiert werden: {e}")
+                    continue
+                if message_id != instances[instance_id]["message_id"]:
+                    instances[instance_id]["message_id"] = message_id
+                    message_id_updates[instance_id] = message_id
+                self.embed_fingerprints[instance_id] = (fingerprint, message_id, time.monotonic())
+
+        # Neue message_ids einmal pro Zyklus speichern; zwischenzeitlich entfernte Instanzen auslassen
+        if message_id_updates:
+            with self.metrics.time("config_write"):
+                async with self.config.instances() as current:
+                    for instance_id, message_id in message_id_updates.items():
+                        if instance_id in current:
+                            current[instance_id]["message_id"] = message_id
+
+        # Im Board-Modus alle Instanzen gemeinsam nach dem Zyklus rendern
+        if channel is not None and board_mode:
+            await self.update_board(channel, instances, force, heartbeat)
 
     @status_updater.before_loop
     async def before_status_updater(self):
@@ -0,0 +1,219 @@
+"""Skalierungs-Benchmark für den Abfragezyklus des API-Cogs – komplett offline.
+
+Startet einen Mock-AMP-Server (siehe mock_amp.py), legt 10, 100 und 1000 simulierte Instanzen an
+und lässt `status_updater` gegen einen Discord-Kanal-Stub laufen. Aus dem Repo-Hauptverzeichnis
+in einer Umgebung mit installiertem Red-DiscordBot:
+
+    python -m API.bench --sizes 10 100 1000 --controllers 10 --latency 0.05 --failure-rate 0.02
+
+Pro Größe werden ein kalter Zyklus (Login, Nachrichten neu senden) und ein warmer Zyklus
+(gecachte Session, Bearbeiten vorhandener Nachrichten) gemessen: Zyklusdauer, Anfragen pro
+Endpunkt, Discord-Aufrufe und maximaler Speicherverbrauch.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from . import api as api_module
+from .mock_amp import MockAMPController
+
+
+class _BenchValueContext:
+    """Wie Reds Config-Werte: awaitbar und als `async with` für Lesen-Ändern-Schreiben nutzbar."""
+
+    def __init__(self, store: dict, key: str):
+        self.store = store
+        self.key = key
+        self.value = None
+
+    def __await__(self):
+        return self._get().__await__()
+
+    async def _get(self):
+        return copy.deepcopy(self.store[self.key])
+
+    async def __aenter__(self):
+        self.value = copy.deepcopy(self.store[self.key])
+        return self.value
+
+    async def __aexit__(self, *exc_info):
+        self.store[self.key] = self.value
+
+
+class _BenchValue:
+    def __init__(self, store: dict, key: str):
+        self.store = store
+        self.key = key
+
+    def __call__(self):
+        return _BenchValueContext(self.store, self.key)
+
+    async def set(self, value):
+        self.store[self.key] = copy.deepcopy(value)
+
+
+class _BenchConfig:
+    """Config-Ersatz im Speicher; der Benchmark soll keine Red-Instanz voraussetzen."""
+
+    def __init__(self):
+        self._store = {}
+
+    @classmethod
+    def get_conf(cls, cog, identifier, **kwargs):
+        return cls()
+
+    def register_global(self, **defaults):
+        self._store.update(copy.deepcopy(defaults))
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _BenchValue(self._store, name)
+
+
+class _StubMessage:
+    def __init__(self, channel, message_id: int):
+        self.channel = channel
+        self.id = message_id
+
+    async def edit(self, **kwargs):
+        await self.channel.simulate("edit")
+
+    async def delete(self):
+        await self.channel.simulate("delete")
+
+
+class _StubChannel:
+    """Discord-Kanal-Stub: zählt Aufrufe und simuliert optional eine Antwortzeit."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = {}
+        self.next_id = 1
+
+    async def simulate(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def get_partial_message(self, message_id: int):
+        return _StubMessage(self, message_id)
+
+    async def send(self, **kwargs):
+        await self.simulate("send")
+        self.next_id += 1
+        return _StubMessage(self, self.next_id)
+
+
+class _StubBot:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def get_channel(self, channel_id):
+        return self.channel
+
+    async def wait_until_ready(self):
+        return None
+
+
+async def run_size(size: int, args, port: int) -> dict:
+    mock = MockAMPController(
+        size, controllers=min(args.controllers, size), latency=args.latency, jitter=args.jitter,
+        failure_rate=args.failure_rate, html_rate=args.html_rate, seed=args.seed
+    )
+    await mock.start(port=port)
+    channel = _StubChannel(args.discord_latency)
+    cog = api_module.API(_StubBot(channel))
+    await cog.open_http_session()
+    try:
+        await cog.config.channel_id.set(1)
+        await cog.config.max_parallel.set(args.max_parallel)
+        await cog.config.instances.set({
+            instance_id: {
+                "name": mock.instances[instance_id]["FriendlyName"],
+                "api_url": api_url,
+                "username": mock.username,
+                "password": mock.password,
+                "ip": "127.0.0.1:27015",
+                "steamlink": "",
+                "description": "Benchmark",
+                "message_id": 0,
+            }
+            for instance_id, api_url in mock.api_urls().items()
+        })
+
+        result = {"instances": size, "controllers": len(mock.controllers)}
+        for phase in ("kalt", "warm"):
+            requests_before = dict(mock.request_counts)
+            calls_before = dict(channel.calls)
+            tracemalloc.start()
+            start = time.perf_counter()
+            await cog.status_updater(force=True)
+            duration = time.perf_counter() - start
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result[phase] = {
+                "cycle_seconds": round(duration, 4),
+                "peak_memory_kib": round(peak / 1024, 1),
+                "amp_requests": {
+                    name: count - requests_before.get(name, 0)
+                    for name, count in mock.request_counts.items()
+                    if count - requests_before.get(name, 0)
+                },
+                "discord_calls": {
+                    name: count - calls_before.get(name, 0)
+                    for name, count in channel.calls.items()
+                    if count - calls_before.get(name, 0)
+                },
+            }
+        result["connections"] = dict(cog.pool_stats)
+        return result
+    finally:
+        await cog.cog_unload()
+        await mock.stop()
+
+
+async def run(args):
+    # Red-Abhängigkeiten des Cogs durch Stubs im Speicher bzw. ein temporäres Verzeichnis ersetzen
+    data_dir = Path(tempfile.mkdtemp(prefix="api-bench-"))
+    api_module.Config = _BenchConfig
+    api_module.cog_data_path = lambda cog: data_dir
+
+    results = []
+    for index, size in enumerate(args.sizes):
+        result = await run_size(size, args, args.port + index)
+        results.append(result)
+        for phase in ("kalt", "warm"):
+            stats = result[phase]
+            print(
+                f"{size:>5} Instanzen / {result['controllers']:>3} Controller [{phase}]: "
+                f"{stats['cycle_seconds']:.3f}s | Speicher-Spitze {stats['peak_memory_kib']:.0f} KiB | "
+                f"AMP {stats['amp_requests']} | Discord {stats['discord_calls']}"
+            )
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark für den Abfragezyklus des API-Cogs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--controllers", type=int, default=10, help="Anzahl simulierter Controller")
+    parser.add_argument("--max-parallel", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="AMP-Antwortzeit in Sekunden")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--html-rate", type=float, default=0.0)
+    parser.add_argument("--discord-latency", type=float, default=0.0, help="Antwortzeit des Discord-Stubs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=18081)
+    parser.add_argument("--output", help="Ergebnisse zusätzlich als JSON-Datei speichern")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+class CircuitBreaker:
+    """Circuit Breaker für einen AMP-Controller.
+
+    geschlossen: Anfragen laufen normal, Fehler werden gezählt.
+    offen:       nach `threshold` Fehlern in Folge; Anfragen werden sofort abgelehnt.
+    halboffen:   nach Ablauf von `cooldown` darf genau eine Probeanfrage durch.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error = None
+
+    def allow(self, now: float) -> bool:
+        """Entscheidet, ob eine Anfrage an den Controller gesendet werden darf."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and now - self.opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN  # Genau diese eine Anfrage ist die Probe
+            return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.last_error = None
+
+    def record_failure(self, now: float, error: str):
+        self.failures += 1
+        self.last_error = error
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            self.state = self.OPEN
+            self.opened_at = now
+
+    def remaining_cooldown(self, now: float) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.cooldown - (now - self.opened_at))
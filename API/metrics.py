@@ -0,0 +1,115 @@
+import math
+import time
+from contextlib import contextmanager
+
+# Obergrenzen der Histogramm-Buckets in Sekunden
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf)
+
+
+class LatencyHistogram:
+    """Latenz-Histogramm mit festen Buckets (kumulativ exportierbar wie bei Prometheus)."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, seconds: float):
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+                break
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Näherungsweises Quantil: Obergrenze des Buckets, in dem das Quantil liegt."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(BUCKETS[index], self.max)
+        return self.max
+
+
+class PipelineMetrics:
+    """Latenzen pro Stufe, Fehler nach Ursache und Zyklusdauer der AMP-Abfragen."""
+
+    def __init__(self):
+        self.histograms = {}  # Stufe -> LatencyHistogram
+        self.errors = {}  # Ursache -> Anzahl
+        self.cycle_overruns = 0
+
+    def observe(self, stage: str, seconds: float):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str):
+        """Misst die Dauer des Blocks (auch wenn er mit einer Ausnahme endet)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def error(self, cause: str):
+        self.errors[cause] = self.errors.get(cause, 0) + 1
+
+    def record_cycle(self, seconds: float, interval: float):
+        self.observe("cycle", seconds)
+        if seconds > interval:
+            self.cycle_overruns += 1
+
+    def to_json(self) -> dict:
+        return {
+            "stages": {
+                stage: {
+                    "count": h.count,
+                    "sum": h.total,
+                    "avg": h.average,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "max": h.max,
+                    "buckets": dict(zip(map(str, BUCKETS), h.bucket_counts)),
+                }
+                for stage, h in self.histograms.items()
+            },
+            "errors": dict(self.errors),
+            "cycle_overruns": self.cycle_overruns,
+        }
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP amp_stage_seconds Dauer der einzelnen Stufen der AMP-Abfrage.",
+            "# TYPE amp_stage_seconds histogram",
+        ]
+        for stage, h in self.histograms.items():
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, h.bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == math.inf else str(bound)
+                lines.append(f'amp_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'amp_stage_seconds_sum{{stage="{stage}"}} {h.total}')
+            lines.append(f'amp_stage_seconds_count{{stage="{stage}"}} {h.count}')
+        lines.append("# HELP amp_errors_total Fehler der AMP-Abfrage nach Ursache.")
+        lines.append("# TYPE amp_errors_total counter")
+        for cause, count in self.errors.items():
+            lines.append(f'amp_errors_total{{cause="{cause}"}} {count}')
+        lines.append("# HELP amp_cycle_overruns_total Zyklen, die länger als das Tick-Intervall dauerten.")
+        lines.append("# TYPE amp_cycle_overruns_total counter")
+        lines.append(f"amp_cycle_overruns_total {self.cycle_overruns}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,175 @@
+"""Lokaler Mock eines oder mehrerer AMP-ADS-Controller zum Offline-Testen des API-Cogs.
+
+Start als eigenständiges Skript (benötigt nur aiohttp):
+
+    python API/mock_amp.py --port 8081 --instances 20 --controllers 2 --latency 0.2 --failure-rate 0.05
+
+Jeder simulierte Controller ist unter einem eigenen Pfad erreichbar (`http://127.0.0.1:8081/c0/`,
+`.../c1/` ...); der erste zusätzlich direkt unter `http://127.0.0.1:8081/`. Die ausgegebenen
+Zeilen enthalten `api_url` und Instanz-ID für `!addinstance`. Unter `/mock/stats` zählt der Mock
+alle Anfragen pro Endpunkt, so lässt sich z.B. prüfen, dass pro Controller und Zyklus nur ein
+GetInstances läuft.
+"""
+import argparse
+import asyncio
+import random
+import uuid
+
+from aiohttp import web
+
+
+class MockAMPController:
+    """Minimale AMP-Controller mit Login, GetInstance und GetInstances.
+
+    latency/jitter:  künstliche Antwortzeit pro Anfrage in Sekunden
+    failure_rate:    Anteil der Anfragen, die mit HTTP 500 beantwortet werden
+    html_rate:       Anteil der Anfragen, die (wie ein Reverse-Proxy-Fehler) HTML liefern
+    """
+
+    def __init__(self, instance_count: int = 10, username: str = "admin", password: str = "admin",
+                 controllers: int = 1, latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, html_rate: float = 0.0, seed: int = None):
+        self.username = username
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.html_rate = html_rate
+        self.random = random.Random(seed)
+        self.sessions = set()
+        self.request_counts = {}
+        self.controllers = {f"c{c}": {} for c in range(max(1, controllers))}
+        self.instances = {}  # Alle Instanzen, unabhängig vom Controller
+        names = list(self.controllers)
+        for i in range(instance_count):
+            instance_id = str(uuid.uuid4())
+            instance = {
+                "InstanceID": instance_id,
+                "InstanceName": f"Mock{i:04d}",
+                "FriendlyName": f"Mock-Instanz {i}",
+                "Running": True,
+                "AppState": 20,
+                "Metrics": {"Active Users": {"RawValue": i % 8, "MaxValue": 8}},
+            }
+            self.controllers[names[i % len(names)]][instance_id] = instance
+            self.instances[instance_id] = instance
+
+        self.app = web.Application()
+        for prefix in ("", "/{controller}"):
+            self.app.router.add_post(f"{prefix}/API/Core/Login", self.handle_login)
+            self.app.router.add_post(f"{prefix}/API/ADSModule/GetInstance", self.handle_get_instance)
+            self.app.router.add_post(f"{prefix}/API/ADSModule/GetInstances", self.handle_get_instances)
+        self.app.router.add_get("/mock/stats", self.handle_stats)
+        self.runner = None
+        self.base_url = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8081):
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, host, port).start()
+        self.base_url = f"http://{host}:{port}/"
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def api_urls(self, base_url: str = None) -> dict:
+        """instance_id -> api_url des Controllers, zu dem die Instanz gehört."""
+        base_url = base_url or self.base_url
+        return {
+            instance_id: f"{base_url}{name}/"
+            for name, instances in self.controllers.items()
+            for instance_id in instances
+        }
+
+    def _count(self, name: str):
+        self.request_counts[name] = self.request_counts.get(name, 0) + 1
+
+    def _controller(self, request) -> dict:
+        return self.controllers.get(request.match_info.get("controller", "c0"), {})
+
+    async def _simulate(self, name: str):
+        """Zählt die Anfrage, wartet die künstliche Latenz ab und würfelt ggf. einen Fehler aus."""
+        self._count(name)
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        roll = self.random.random()
+        if roll < self.failure_rate:
+            self._count("injected_500")
+            return web.Response(status=500, text="Internal Server Error")
+        if roll < self.failure_rate + self.html_rate:
+            self._count("injected_html")
+            return web.Response(text="<html><body>502 Bad Gateway</body></html>", content_type="text/html")
+        return None
+
+    def _unauthorized(self):
+        return web.json_response({"Title": "Unauthorized Access", "Message": "Session ungültig."}, status=401)
+
+    async def handle_login(self, request):
+        failure = await self._simulate("Login")
+        if failure is not None:
+            return failure
+        body = await request.json()
+        if body.get("username") != self.username or body.get("password") != self.password:
+            return web.json_response({"success": False, "message": "Falsche Zugangsdaten."})
+        session_id = str(uuid.uuid4())
+        self.sessions.add(session_id)
+        return web.json_response({"success": True, "sessionID": session_id})
+
+    async def handle_get_instance(self, request):
+        failure = await self._simulate("GetInstance")
+        if failure is not None:
+            return failure
+        body = await request.json()
+        if body.get("SESSIONID") not in self.sessions:
+            return self._unauthorized()
+        instance = self._controller(request).get(body.get("InstanceId"))
+        if instance is None:
+            return web.json_response({})
+        return web.json_response(instance)
+
+    async def handle_get_instances(self, request):
+        failure = await self._simulate("GetInstances")
+        if failure is not None:
+            return failure
+        body = await request.json()
+        if body.get("SESSIONID") not in self.sessions:
+            return self._unauthorized()
+        return web.json_response([{
+            "InstanceId": "00000000-0000-0000-0000-000000000000",
+            "FriendlyName": "Mock-ADS",
+            "AvailableInstances": list(self._controller(request).values()),
+        }])
+
+    async def handle_stats(self, request):
+        return web.json_response(self.request_counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startet lokale Mock-AMP-Controller.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--instances", type=int, default=10)
+    parser.add_argument("--controllers", type=int, default=1)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--latency", type=float, default=0.0, help="Antwortzeit pro Anfrage in Sekunden")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Zusätzliche zufällige Antwortzeit")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Anteil der HTTP-500-Antworten")
+    parser.add_argument("--html-rate", type=float, default=0.0, help="Anteil der HTML-Antworten")
+    args = parser.parse_args()
+
+    controller = MockAMPController(
+        args.instances, args.username, args.password, controllers=args.controllers,
+        latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate, html_rate=args.html_rate
+    )
+    base_url = f"http://{args.host}:{args.port}/"
+    for instance_id, api_url in controller.api_urls(base_url).items():
+        print(f"{api_url}  {instance_id}  {controller.instances[instance_id]['FriendlyName']}")
+    web.run_app(controller.app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
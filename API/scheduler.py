@@ -0,0 +1,72 @@
+import heapq
+
+
+class PollScheduler:
+    """Plant die nächste Abfrage pro ADS-Controller über eine Prioritätswarteschlange von Fälligkeitszeiten.
+
+    Eine Abfrage liefert immer den Status aller Instanzen eines Controllers (GetInstances), daher wird
+    pro Controller geplant; der Zustandsschlüssel fasst die Zustände aller seiner Instanzen zusammen.
+
+    - Controller, die wiederholt nicht erreichbar sind, werden exponentiell seltener abgefragt.
+    - Ändert sich der Zustand einer seiner Instanzen, wird der Controller im Mindestabstand abgefragt
+      und danach schrittweise wieder auf das normale Intervall zurückgeführt.
+    """
+
+    def __init__(self):
+        self.queue = []  # Heap aus (fällig_um, schlüssel); veraltete Einträge werden übersprungen
+        self.next_due = {}  # schlüssel -> aktuelle Fälligkeit
+        self.intervals = {}  # schlüssel -> aktuelles Abfrageintervall in Sekunden
+        self.state_keys = {}  # schlüssel -> zuletzt gesehener Zustand (für Änderungserkennung)
+
+    def schedule(self, key, due: float):
+        self.next_due[key] = due
+        heapq.heappush(self.queue, (due, key))
+
+    def sync(self, keys, now: float):
+        """Nimmt neue Controller sofort in den Plan auf und vergisst entfernte."""
+        keys = set(keys)
+        for key in keys - self.next_due.keys():
+            self.schedule(key, now)
+        for key in self.next_due.keys() - keys:
+            del self.next_due[key]
+            self.intervals.pop(key, None)
+            self.state_keys.pop(key, None)
+
+    def pop_due(self, now: float) -> list:
+        """Entnimmt alle Controller, deren Abfrage fällig ist."""
+        due_keys = []
+        while self.queue and self.queue[0][0] <= now:
+            due, key = heapq.heappop(self.queue)
+            if self.next_due.get(key) == due:
+                due_keys.append(key)
+        return due_keys
+
+    def record(self, key, state_key, failed: bool, now: float,
+               base_interval: float, min_interval: float, max_interval: float) -> float:
+        """Verarbeitet ein Abfrageergebnis und plant die nächste Abfrage. Gibt das neue Intervall zurück.
+
+        `failed` steht nur für Transport- oder Controller-Fehler; gestoppte Instanzen sind ein
+        gültiger Zustand und verlängern das Intervall nicht.
+        """
+        current = self.intervals.get(key, base_interval)
+        previous_key = self.state_keys.get(key)
+        changed = previous_key is not None and previous_key != state_key
+
+        if failed:
+            interval = min(max_interval, max(current, base_interval) * 2)
+        elif changed:
+            interval = min_interval
+        else:
+            interval = min(base_interval, current * 2)
+        interval = max(min_interval, interval)
+
+        self.state_keys[key] = state_key
+        self.intervals[key] = interval
+        if key in self.next_due:
+            self.schedule(key, now + interval)
+        return interval
+
+    def cap_due(self, key, due: float):
+        """Zieht die nächste Abfrage vor, falls sie später als `due` geplant ist."""
+        if key in self.next_due and due < self.next_due[key]:
+            self.schedule(key, due)
@@ -0,0 +1,163 @@
+import bisect
+import os
+import re
+import struct
+
+# Ein Datensatz pro Zeitfenster: Beginn, abgedeckte Sekunden, davon online, Spieler-Sekunden, Spielermaximum
+RECORD = struct.Struct("<IIIQH")
+
+# (Name, Fensterbreite, Aufbewahrung) in Sekunden – von fein nach grob
+TIERS = (
+    ("minute", 60, 2 * 86400),
+    ("hour", 3600, 60 * 86400),
+    ("day", 86400, 730 * 86400),
+)
+
+# Ab so vielen abgelaufenen Datensätzen wird eine Datei neu geschrieben
+REWRITE_THRESHOLD = 512
+
+
+class InstanceSeries:
+    """Zeitreihe einer Instanz mit automatischer Verdichtung Minute → Stunde → Tag.
+
+    Jede Abfrage wird gleichzeitig in das offene Fenster jeder Stufe eingerechnet, gewichtet mit der
+    Zeit, die sie abdeckt – die Abfrageintervalle unterscheiden sich je nach Zustand, eine Zählung
+    pro Abfrage wäre daher verzerrt. Abgeschlossene Fenster werden als 22-Byte-Datensatz an die
+    Datei der Stufe angehängt. Da alle Werte additiv sind, sind doppelte Fenster (z.B. nach einem
+    Neustart) für Auswertungen unschädlich.
+    """
+
+    def __init__(self, directory: str, instance_id: str):
+        safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", instance_id)
+        self.paths = {name: os.path.join(directory, f"{safe_id}.{name}.bin") for name, _, _ in TIERS}
+        self.records = {name: [] for name, _, _ in TIERS}  # abgeschlossene Fenster, nach Beginn sortiert
+        self.open = {name: None for name, _, _ in TIERS}  # aktuell offenes Fenster pro Stufe
+        self.expired_on_disk = {name: 0 for name, _, _ in TIERS}
+
+    def load(self, now: float):
+        for name, _width, retention in TIERS:
+            path = self.paths[name]
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                raw = f.read()
+            usable = len(raw) - len(raw) % RECORD.size  # Abgeschnittenen letzten Datensatz ignorieren
+            records = [list(r) for r in RECORD.iter_unpack(raw[:usable])]
+            records.sort(key=lambda r: r[0])
+            cutoff = now - retention
+            kept = [r for r in records if r[0] >= cutoff]
+            self.records[name] = kept
+            if len(kept) != len(records) or usable != len(raw):
+                self._rewrite(name)
+
+    def add(self, timestamp: float, seconds: float, up: bool, players: int):
+        """Rechnet eine Abfrage ein, die die letzten `seconds` Sekunden abdeckt."""
+        timestamp = int(timestamp)
+        seconds = max(0, int(round(seconds)))
+        players = max(0, min(int(players), 0xFFFF))
+        for name, width, retention in TIERS:
+            start = timestamp - timestamp % width
+            bucket = self.open[name]
+            if bucket is not None and bucket[0] != start:
+                self._close_bucket(name, bucket, timestamp - retention)
+                bucket = None
+            if bucket is None:
+                bucket = self.open[name] = [start, 0, 0, 0, 0]
+            bucket[1] += seconds
+            bucket[2] += seconds if up else 0
+            bucket[3] += players * seconds
+            bucket[4] = max(bucket[4], players)
+
+    def flush(self):
+        """Schreibt alle offenen Fenster weg (z.B. beim Entladen des Cogs)."""
+        for name, _width, _retention in TIERS:
+            bucket = self.open[name]
+            if bucket is not None:
+                self._close_bucket(name, bucket, None)
+                self.open[name] = None
+
+    def _close_bucket(self, name: str, bucket: list, cutoff):
+        records = self.records[name]
+        records.append(bucket)
+        with open(self.paths[name], "ab") as f:
+            f.write(RECORD.pack(*bucket))
+        if cutoff is None:
+            return
+        expired = bisect.bisect_left(records, [cutoff])
+        if expired:
+            del records[:expired]
+            self.expired_on_disk[name] += expired
+            if self.expired_on_disk[name] >= REWRITE_THRESHOLD:
+                self._rewrite(name)
+
+    def _rewrite(self, name: str):
+        path = self.paths[name]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(RECORD.pack(*r) for r in self.records[name]))
+        os.replace(tmp_path, path)
+        self.expired_on_disk[name] = 0
+
+    def query(self, start: float, end: float):
+        """Summiert (Sekunden, davon online, Spieler-Sekunden, Spielermaximum) über [start, end).
+
+        Volle Tage kommen aus der Tagesstufe, angebrochene Tage aus der Stundenstufe und
+        angebrochene Stunden aus der Minutenstufe. Der Aufwand hängt daher nur von der
+        Aufbewahrungsdauer ab, nicht von der Zahl der gespeicherten Abfragen.
+        """
+        covered = {}  # Stufenname -> Beginn der bereits aus gröberen Stufen gezählten Fenster
+        total = [0, 0, 0, 0]
+        for name, width, _retention in reversed(TIERS):
+            records = self.records[name]
+            if self.open[name] is not None:
+                records = records + [self.open[name]]
+            first = bisect.bisect_left(records, [start])
+            starts = set()
+            for record in records[first:]:
+                bucket_start = record[0]
+                if bucket_start >= end:
+                    break
+                # Minuten sind die feinste Stufe und werden auch angebrochen gezählt
+                if name != TIERS[0][0] and bucket_start + width > end:
+                    continue
+                if any(bucket_start - bucket_start % w in covered.get(n, ()) for n, w, _ in TIERS if w > width):
+                    continue
+                starts.add(bucket_start)
+                total[0] += record[1]
+                total[1] += record[2]
+                total[2] += record[3]
+                total[3] = max(total[3], record[4])
+            covered[name] = starts
+        return tuple(total)
+
+
+class TimeSeriesStore:
+    """Verwaltet die Zeitreihen aller Instanzen unter einem Verzeichnis."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.series = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, instance_id: str, now: float) -> InstanceSeries:
+        series = self.series.get(instance_id)
+        if series is None:
+            series = self.series[instance_id] = InstanceSeries(self.directory, instance_id)
+            series.load(now)
+        return series
+
+    def add(self, instance_id: str, timestamp: float, seconds: float, up: bool, players: int):
+        self.get(instance_id, timestamp).add(timestamp, seconds, up, players)
+
+    def query(self, instance_id: str, start: float, end: float):
+        return self.get(instance_id, end).query(start, end)
+
+    def delete(self, instance_id: str):
+        series = self.series.pop(instance_id, None) or InstanceSeries(self.directory, instance_id)
+        for path in series.paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+    def flush(self):
+        for series in self.series.values():
+            series.flush()
@@ -2,12 +2,17 @@ import discord
 import json
 import os
 import datetime
+import time
 import matplotlib.pyplot as plt
 import numpy as np
 from redbot.core import commands, checks, Config
 from redbot.core.bot import Red
+from redbot.core.data_manager import cog_data_path
 from discord.ext import tasks
 
+from .occupancy import VoiceOccupancy
+from .ringbuffer import SCALE, VoiceRingBuffer
+
 class VoiceHeatmap(commands.Cog):
     """
     Erstellt eine Heatmap der Voice-Chat-Aktivität über 24 Stunden und 7 Wochentage
@@ -18,33 +23,93 @@ class VoiceHeatmap(commands.Cog):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=1234567890, force_registration=True)
         self.config.register_guild(
-            voice_data=[],
+            voice_data=[],  # Nur noch für die einmalige Übernahme in den Ringpuffer
             ignored_channels=[],
             darkmode=False
         )
+        self.buffers = {}  # guild_id -> VoiceRingBuffer
+        self.ignored = {}  # guild_id -> Set ignorierter Channel-IDs (Speicher-Cache der Config)
+        self.occupancy = {}  # guild_id -> VoiceOccupancy
+
+    async def cog_load(self):
+        """Lädt die Ignorierlisten in den Speicher, damit der Minutentakt ohne Config auskommt"""
+        for guild_id, data in (await self.config.all_guilds()).items():
+            self.ignored[guild_id] = set(data.get("ignored_channels", []))
         self.collect_voice_data.start()
 
     def cog_unload(self):
         self.collect_voice_data.cancel()
+        for buffer in self.buffers.values():
+            buffer.close()
+
+    async def get_buffer(self, guild):
+        """Öffnet den Ringpuffer eines Servers und übernimmt beim ersten Mal die alten Config-Daten"""
+        buffer = self.buffers.get(guild.id)
+        if buffer is None:
+            buffer = VoiceRingBuffer(str(cog_data_path(self) / f"voice_{guild.id}.bin"))
+            self.buffers[guild.id] = buffer
+            data = await self.config.guild(guild).voice_data()
+            if data:
+                for entry in data:
+                    dt = datetime.datetime.fromisoformat(entry["timestamp"]).replace(tzinfo=datetime.timezone.utc)
+                    buffer.record(int(dt.timestamp()) // 60, entry["voice_count"])
+                await self.config.guild(guild).voice_data.clear()
+                print(f"[VoiceHeatmap] ✅ {len(data)} Datenpunkte von Server {guild.id} in den Ringpuffer übernommen.")
+        return buffer
+
+    def sync_occupancy(self, guild):
+        """Zählt die Voicechannels eines Servers einmal vollständig; danach pflegen Events die Zahlen"""
+        counts = {vc.id: len(vc.members) for vc in guild.voice_channels}
+        occupancy = self.occupancy.get(guild.id)
+        if occupancy is None:
+            occupancy = VoiceOccupancy(counts, self.ignored.get(guild.id, set()), time.monotonic())
+            self.occupancy[guild.id] = occupancy
+        else:
+            occupancy.reset(counts, time.monotonic())
+        return occupancy
 
     @tasks.loop(minutes=1)
     async def collect_voice_data(self):
+        minute = int(time.time()) // 60
+        now = time.monotonic()
         for guild in self.bot.guilds:
-            ignored = await self.config.guild(guild).ignored_channels()
-            count = sum(len(vc.members) for vc in guild.voice_channels if vc.id not in ignored)
-            timestamp = datetime.datetime.utcnow().replace(second=0, microsecond=0).isoformat()
-            data = await self.config.guild(guild).voice_data()
-            data.append({"timestamp": timestamp, "voice_count": count})
-            MAX_ENTRIES = 129600
-            if len(data) > MAX_ENTRIES:
-                data = data[-MAX_ENTRIES:]
-            cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=90)
-            data = [entry for entry in data if datetime.datetime.fromisoformat(entry["timestamp"]) > cutoff]
-            await self.config.guild(guild).voice_data.set(data)
+            occupancy = self.occupancy.get(guild.id) or self.sync_occupancy(guild)
+            buffer = await self.get_buffer(guild)
+            # Zeitgewichtetes Mittel der letzten Minute; eine Stelle schreiben, Daten älter als 90 Tage werden überschrieben
+            buffer.record(minute, occupancy.snapshot(now))
 
     @collect_voice_data.before_loop
     async def before_collect(self):
         await self.bot.wait_until_ready()
+        for guild in self.bot.guilds:
+            self.sync_occupancy(guild)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Nach einem Neuverbinden können Voice-Events fehlen – daher neu zählen"""
+        for guild in self.bot.guilds:
+            self.sync_occupancy(guild)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        """Hält die Live-Belegung pro Channel aktuell, wenn jemand einen Voicechannel betritt, wechselt oder verlässt"""
+        if before.channel == after.channel:
+            return  # Nur Stummschalten o.Ä.
+        occupancy = self.occupancy.get(member.guild.id)
+        if occupancy is None:
+            return  # Wird beim nächsten Takt vollständig gezählt
+        now = time.monotonic()
+        if isinstance(before.channel, discord.VoiceChannel):
+            occupancy.move(before.channel.id, -1, now)
+        if isinstance(after.channel, discord.VoiceChannel):
+            occupancy.move(after.channel.id, 1, now)
+
+    async def set_ignored(self, guild, ignored):
+        await self.config.guild(guild).ignored_channels.set(ignored)
+        self.ignored[guild.id] = set(ignored)
+        occupancy = self.occupancy.get(guild.id)
+        if occupancy is not None:
+            occupancy.set_ignored(self.ignored[guild.id], time.monotonic())
 
     @commands.command(name="voiceheat")
     @checks.admin()
@@ -76,7 +141,7 @@ class VoiceHeatmap(commands.Cog):
                     ignored = await self.config.guild(ctx.guild).ignored_channels()
                     if channel.id not in ignored:
                         ignored.append(channel.id)
-                        await self.config.guild(ctx.guild).ignored_channels.set(ignored)
+                        await self.set_ignored(ctx.guild, ignored)
                     return await ctx.send(f"Kanal {channel.mention} wird nun ignoriert.")
                 else:
                     return await ctx.send("Das ist kein gültiger Voicechannel.")
@@ -91,7 +156,7 @@ class VoiceHeatmap(commands.Cog):
                     ignored = await self.config.guild(ctx.guild).ignored_channels()
                     if channel.id in ignored:
                         ignored.remove(channel.id)
-                        await self.config.guild(ctx.guild).ignored_channels.set(ignored)
+                        await self.set_ignored(ctx.guild, ignored)
                         return await ctx.send(f"Kanal {channel.mention} wird nicht mehr ignoriert.")
                     else:
                         return await ctx.send("Dieser Kanal wird aktuell nicht ignoriert.")
@@ -102,9 +167,9 @@ class VoiceHeatmap(commands.Cog):
 
         if subcommand.lower() == "status":
             dark = await self.config.guild(ctx.guild).darkmode()
-            ignored = await self.config.guild(ctx.guild).ignored_channels()
-            data = await self.config.guild(ctx.guild).voice_data()
-            count = len(data)
+            ignored = self.ignored.get(ctx.guild.id, set())
+            buffer = await self.get_buffer(ctx.guild)
+            count = buffer.count()
             return await ctx.send(
                 f"📊 **Status der VoiceHeatmap:**\n"
                 f"- Darkmode: {'aktiviert' if dark else 'deaktiviert'}\n"
@@ -113,19 +178,14 @@ class VoiceHeatmap(commands.Cog):
             )
 
         if subcommand.lower() == "map":
-            data = await self.config.guild(ctx.guild).voice_data()
-            if not data:
+            buffer = await self.get_buffer(ctx.guild)
+            if not buffer.count():
                 return await ctx.send("Keine Voice-Daten vorhanden.")
 
-            heatmap = [[[] for _ in range(24)] for _ in range(7)]
-            for entry in data:
-                dt = datetime.datetime.fromisoformat(entry["timestamp"])
-                weekday = dt.weekday()
-                hour = dt.hour
-                heatmap[weekday][hour].append(entry["voice_count"])
-
-            avg_data = [[np.mean(hour) if hour else 0 for hour in day] for day in heatmap]
-            heatmap_array = np.array(avg_data)
+            # Laufend gepflegte Summen und Anzahlen pro (Wochentag, Stunde) – unabhängig von der Datenmenge
+            sums = np.array(buffer.sums, dtype=float) / SCALE
+            counts = np.array(buffer.counts, dtype=float)
+            heatmap_array = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
 
             dark = await self.config.guild(ctx.guild).darkmode()
             if dark:
@@ -139,17 +199,15 @@ class VoiceHeatmap(commands.Cog):
             cax = ax.imshow(heatmap_array, cmap=cmap, aspect='auto', origin='upper')
             plt.colorbar(cax, ax=ax, label='Durchschnittliche Nutzerzahl')
 
-            alle_werte = [wert for tag in heatmap for stunde in tag for wert in stunde]
-            gesamt_anzahl = sum(alle_werte)
-            gesamt_punkte = len(alle_werte)
+            gesamt_anzahl = sums.sum()
+            gesamt_punkte = counts.sum()
             durchschn_pro_stunde = gesamt_anzahl / gesamt_punkte if gesamt_punkte else 0
 
             # Ø/Tag berechnen: Durchschnitt pro Wochentag
             durchschn_pro_tag = 0
-            for tag in heatmap:
-                werte_pro_tag = [wert for stunde in tag for wert in stunde]
-                if werte_pro_tag:
-                    durchschn_pro_tag += sum(werte_pro_tag) / len(werte_pro_tag)
+            for summe_tag, punkte_tag in zip(sums.sum(axis=1), counts.sum(axis=1)):
+                if punkte_tag:
+                    durchschn_pro_tag += summe_tag / punkte_tag
             durchschn_pro_tag /= 7 if durchschn_pro_tag else 1
             max_wert = np.max(heatmap_array)
 
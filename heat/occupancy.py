@@ -0,0 +1,54 @@
+class VoiceOccupancy:
+    """Live-Belegung der Voicechannels eines Servers, gepflegt über on_voice_state_update.
+
+    Neben der Nutzerzahl pro Channel wird die Fläche "Nutzer × Sekunden" seit Beginn des aktuellen
+    Messfensters aufsummiert. `snapshot` liefert daraus das zeitgewichtete Mittel statt einer
+    Momentaufnahme und beginnt das nächste Fenster.
+    """
+
+    def __init__(self, channel_counts: dict, ignored: set, now: float):
+        self.channels = {}  # channel_id -> Nutzerzahl
+        self.ignored = set(ignored)
+        self.current = 0  # Nutzer in nicht ignorierten Channels
+        self.area = 0.0
+        self.window_start = now
+        self.last_change = now
+        self.reset(channel_counts, now)
+
+    def _advance(self, now: float):
+        self.area += self.current * (now - self.last_change)
+        self.last_change = now
+
+    def _recount(self):
+        self.current = sum(count for channel_id, count in self.channels.items() if channel_id not in self.ignored)
+
+    def reset(self, channel_counts: dict, now: float):
+        """Übernimmt eine vollständige Zählung, z.B. nach dem (Wieder-)Verbinden."""
+        self._advance(now)
+        self.channels = {channel_id: count for channel_id, count in channel_counts.items() if count}
+        self._recount()
+
+    def set_ignored(self, ignored: set, now: float):
+        self._advance(now)
+        self.ignored = set(ignored)
+        self._recount()
+
+    def move(self, channel_id: int, delta: int, now: float):
+        self._advance(now)
+        before = self.channels.get(channel_id, 0)
+        count = max(before + delta, 0)
+        if count:
+            self.channels[channel_id] = count
+        else:
+            self.channels.pop(channel_id, None)
+        if channel_id not in self.ignored:
+            self.current += count - before
+
+    def snapshot(self, now: float) -> float:
+        """Zeitgewichtete mittlere Nutzerzahl seit dem letzten Aufruf."""
+        self._advance(now)
+        elapsed = now - self.window_start
+        average = self.area / elapsed if elapsed > 0 else float(self.current)
+        self.area = 0.0
+        self.window_start = now
+        return average
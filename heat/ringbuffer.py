@@ -0,0 +1,135 @@
+import os
+import struct
+import sys
+from array import array
+
+SLOTS = 90 * 24 * 60  # Eine Stelle pro Minute der letzten 90 Tage
+SCALE = 10  # Messwerte werden in Zehntel Nutzern gespeichert (zeitgewichtete Minutenmittel)
+MAX_VALUE = 0xFFFE  # Gespeichert wird Wert + 1, 0 bedeutet "kein Messwert"
+HEADER = struct.Struct("<4sHq")  # Kennung, Version, zuletzt geschriebene Minute
+MAGIC = b"VHRB"
+VERSION = 1
+NO_MINUTE = -1
+
+
+class VoiceRingBuffer:
+    """Minutengenauer Ringpuffer für Voice-Messwerte in einer Binärdatei pro Server.
+
+    Die Minute m (Minuten seit 1970, UTC) liegt in Stelle m % SLOTS. Beim Schreiben werden
+    übersprungene Minuten geleert, ältere als 90 Tage werden einfach überschrieben – ein Ablaufen
+    alter Daten muss also nie berechnet werden. Jeder Messwert ist ein einzelner 2-Byte-Schreibvorgang.
+
+    `sums` (in Zehntel Nutzern, siehe SCALE) und `counts` enthalten Summe und Anzahl der Messwerte
+    pro (Wochentag, Stunde). Sie werden beim Laden einmal aufgebaut und danach bei jedem neuen und
+    jedem herausfallenden Wert angepasst.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.slots = array("H", bytes(2 * SLOTS))
+        self.last_minute = NO_MINUTE
+        self.sums = [[0] * 24 for _ in range(7)]
+        self.counts = [[0] * 24 for _ in range(7)]
+        if os.path.exists(path):
+            self._load()
+        else:
+            self._create()
+        self.file = open(path, "r+b")
+        for minute, value in self.samples():
+            self._account(minute, value, 1)
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            magic, version, last_minute = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Unbekanntes Dateiformat: {self.path}")
+            self.slots = array("H")
+            self.slots.frombytes(f.read(2 * SLOTS))
+        if sys.byteorder == "big":
+            self.slots.byteswap()
+        self.last_minute = last_minute
+
+    def _create(self):
+        slots = array("H", self.slots)
+        if sys.byteorder == "big":
+            slots.byteswap()
+        with open(self.path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.last_minute))
+            f.write(slots.tobytes())
+
+    def _account(self, minute: int, value: int, sign: int):
+        weekday, hour = minute_weekday(minute), minute_hour(minute)
+        self.sums[weekday][hour] += sign * value
+        self.counts[weekday][hour] += sign
+
+    def close(self):
+        self.file.close()
+
+    def _write_slots(self, start: int, stop: int):
+        """Schreibt die Stellen [start, stop) des Puffers in die Datei."""
+        chunk = self.slots[start:stop]
+        if sys.byteorder == "big":
+            chunk.byteswap()
+        self.file.seek(HEADER.size + 2 * start)
+        self.file.write(chunk.tobytes())
+
+    def _clear(self, first_minute: int, last_minute: int):
+        """Leert die Stellen der Minuten first_minute bis last_minute (inklusive)."""
+        if last_minute - first_minute + 1 >= SLOTS:
+            first_minute, last_minute = 0, SLOTS - 1
+            self.sums = [[0] * 24 for _ in range(7)]
+            self.counts = [[0] * 24 for _ in range(7)]
+        else:
+            # Die Stellen enthalten bisher die Minuten genau ein Fenster früher
+            for minute in range(first_minute, last_minute + 1):
+                stored = self.slots[minute % SLOTS]
+                if stored:
+                    self._account(minute - SLOTS, stored - 1, -1)
+        start, stop = first_minute % SLOTS, last_minute % SLOTS
+        ranges = [(start, stop + 1)] if start <= stop else [(start, SLOTS), (0, stop + 1)]
+        for begin, end in ranges:
+            self.slots[begin:end] = array("H", bytes(2 * (end - begin)))
+            self._write_slots(begin, end)
+
+    def record(self, minute: int, users: float):
+        """Speichert die (mittlere) Nutzerzahl einer Minute; Minuten außerhalb des Fensters werden ignoriert."""
+        if self.last_minute != NO_MINUTE:
+            if minute <= self.last_minute - SLOTS:
+                return
+            if minute > self.last_minute + 1:
+                self._clear(self.last_minute + 1, minute - 1)
+        index = minute % SLOTS
+        stored = self.slots[index]
+        if stored:
+            # Überschrieben wird entweder dieselbe Minute oder die genau ein Fenster ältere
+            self._account(minute if minute <= self.last_minute else minute - SLOTS, stored - 1, -1)
+        value = min(max(round(users * SCALE), 0), MAX_VALUE)
+        self.slots[index] = value + 1
+        self._account(minute, value, 1)
+        self._write_slots(index, index + 1)
+        if minute > self.last_minute:
+            self.last_minute = minute
+            self.file.seek(0)
+            self.file.write(HEADER.pack(MAGIC, VERSION, self.last_minute))
+        self.file.flush()
+
+    def samples(self):
+        """Alle gespeicherten Messwerte des Fensters als (minute, wert in Zehntel Nutzern), älteste zuerst."""
+        if self.last_minute == NO_MINUTE:
+            return
+        for minute in range(self.last_minute - SLOTS + 1, self.last_minute + 1):
+            stored = self.slots[minute % SLOTS]
+            if stored:
+                yield minute, stored - 1
+
+    def count(self) -> int:
+        return sum(map(sum, self.counts))
+
+
+def minute_weekday(minute: int) -> int:
+    """Wochentag (Montag = 0) einer Minute seit 1970 – der 1.1.1970 war ein Donnerstag."""
+    return (minute // 1440 + 3) % 7
+
+
+def minute_hour(minute: int) -> int:
+    return (minute // 60) % 24
@@ -1,6 +1,19 @@
+import asyncio
 import discord
+from discord.ext import tasks
 from redbot.core import commands, Config
-from datetime import datetime, timedelta
+from redbot.core.data_manager import cog_data_path
+from datetime import datetime, timezone
+
+from .phash import IMAGE_ERRORS, BKTree, dhash
+from .storage import PERIODS, MemeStore, retention_cutoff
+
+MIGRATION_CHUNK_SIZE = 1000  # Memes pro Transaktion bei der Übernahme aus der Config
+LEADERBOARD_PAGE_SIZE = 20  # Nutzer pro Seite bei `!mdma leaderboard <seite>`
+MAX_HASH_BYTES = 10 * 1024 * 1024  # Größere Anhänge werden für die Repost-Erkennung nicht geladen
+MEME_FLUSH_SECONDS = 2  # Spätestens nach dieser Zeit landen neue Memes in der Datenbank
+MEME_FLUSH_SIZE = 50  # ... oder sofort, sobald so viele gepuffert sind
+MAX_RETENTION_MONTHS = 120
 
 class MemeBot(commands.Cog):
     """Ein Meme-Voting-Cog für RedBot"""
@@ -12,38 +25,199 @@ class MemeBot(commands.Cog):
             "meme_channel": None,
             "positive_emoji": "⬆️",
             "negative_emoji": "⬇️",
-            "memes": {}
+            "repost_threshold": 6,  # Max. abweichende Hash-Bits für einen Repost, 0 = aus
+            "retention_months": 0,  # Memes älter als so viele Monate zu Monatszusammenfassungen verdichten, 0 = nie
+            "memes": {}  # Nur noch für die einmalige Übernahme in die SQLite-Datenbank
         }
         self.config.register_guild(**default_guild)
+        self.meme_settings = {}  # guild_id -> {"meme_channel", "positive_emoji", "negative_emoji", "repost_threshold"}
+        self.store = MemeStore(str(cog_data_path(self) / "memes.sqlite3"))
+        self.hash_index = {}  # guild_id -> BKTree der Bild-Hashes, Werte (message_id, channel_id)
+        self.pending_memes = {}  # message_id -> noch nicht gespeicherter Meme-Datensatz
+        self.reaction_tasks = set()
+
+    async def cog_load(self):
+        """Lädt Meme-Kanal und Emojis aller Server in den Speicher, damit on_message ohne Config auskommt"""
+        for guild_id, data in (await self.config.all_guilds()).items():
+            self._cache_settings(guild_id, data)
+            if data.get("memes"):
+                await self.migrate_config_memes(guild_id, data["memes"])
+        self.build_hash_index()
+        self.flush_loop.start()
+        self.compaction_loop.start()
+
+    def cog_unload(self):
+        self.flush_loop.cancel()
+        self.compaction_loop.cancel()
+        self.flush_memes()
+        self.store.close()
+
+    def flush_memes(self):
+        """Schreibt alle gepufferten neuen Memes in einer Transaktion in die Datenbank"""
+        if not self.pending_memes:
+            return
+        batch = list(self.pending_memes.values())
+        self.store.add_memes(batch)
+        self.pending_memes.clear()
+        print(f"[MemeBot] ✅ {len(batch)} Memes gespeichert.")
+
+    @tasks.loop(seconds=MEME_FLUSH_SECONDS)
+    async def flush_loop(self):
+        self.flush_memes()
+
+    def compact_guild(self, guild_id, months):
+        """Verdichtet alle Memes eines Servers, die vor dem Aufbewahrungszeitraum liegen"""
+        self.flush_memes()
+        cutoff = retention_cutoff(datetime.now(timezone.utc).timestamp(), months)
+        return self.store.compact(guild_id, cutoff)
+
+    @tasks.loop(hours=24)
+    async def compaction_loop(self):
+        """Wendet einmal täglich die Aufbewahrungsregel aller Server an"""
+        for guild_id, data in (await self.config.all_guilds()).items():
+            months = data.get("retention_months", 0)
+            if months > 0:
+                compacted = self.compact_guild(guild_id, months)
+                if compacted:
+                    print(f"[MemeBot] ✅ {compacted} Memes von Server {guild_id} zu Monatszusammenfassungen verdichtet.")
+
+    async def migrate_config_memes(self, guild_id, memes):
+        """Übernimmt die Memes eines Servers einmalig aus der Config in die SQLite-Datenbank"""
+        batch = []
+        for meme in memes.values():
+            batch.append(meme)
+            if len(batch) >= MIGRATION_CHUNK_SIZE:
+                self.store.import_memes(guild_id, batch)
+                batch = []
+                await asyncio.sleep(0)  # Event-Loop zwischen den Blöcken nicht blockieren
+        if batch:
+            self.store.import_memes(guild_id, batch)
+        # Bestenlisten und Rangliste einmal nach dem letzten Block statt pro Block neu aufbauen
+        self.store.rebuild_top_index(guild_id)
+        self.store.rebuild_author_scores(guild_id)
+        # Erst nach vollständiger Übernahme leeren; ein Abbruch wird beim nächsten Laden wiederholt
+        await self.config.guild_from_id(guild_id).memes.clear()
+        print(f"[MemeBot] ✅ {len(memes)} Memes von Server {guild_id} in die Datenbank übernommen.")
+
+    def _cache_settings(self, guild_id, data):
+        if data.get("meme_channel"):
+            self.meme_settings[guild_id] = {
+                "meme_channel": data["meme_channel"],
+                "positive_emoji": data.get("positive_emoji", "⬆️"),
+                "negative_emoji": data.get("negative_emoji", "⬇️"),
+                "repost_threshold": data.get("repost_threshold", 6),
+            }
+        else:
+            self.meme_settings.pop(guild_id, None)
 
-    async def get_top_meme(self, ctx, time_filter):
-        """Findet das Bild mit den meisten Netto-Upvotes"""
-        await self.update_reaction_counts(ctx)  # FIX: Jetzt mit self aufgerufen
+    async def refresh_settings(self, guild):
+        """Aktualisiert den Speicher-Cache nach einer Änderung der Einstellungen"""
+        guild_config = await self.config.guild(guild).all()
+        self._cache_settings(guild.id, guild_config)
 
+    def build_hash_index(self, guild_id=None):
+        """Baut die BK-Bäume für die Repost-Erkennung aus den gespeicherten Hashes auf"""
+        if guild_id is None:
+            self.hash_index = {}
+        else:
+            self.hash_index[guild_id] = BKTree()
+        for hash_guild_id, message_id, channel_id, value in self.store.iter_hashes(guild_id):
+            self.hash_index.setdefault(hash_guild_id, BKTree()).add(value, (message_id, channel_id))
+
+    async def hash_images(self, message):
+        """Berechnet die Bild-Hashes aller Bild-Anhänge; das Dekodieren läuft in einem Thread"""
+        loop = asyncio.get_running_loop()
+        hashes = []
+        for attachment in message.attachments:
+            if not (attachment.content_type or "").startswith("image/") or attachment.size > MAX_HASH_BYTES:
+                continue
+            try:
+                data = await attachment.read()
+                hashes.append(await loop.run_in_executor(None, dhash, data))
+            except (discord.HTTPException, *IMAGE_ERRORS) as e:
+                print(f"[MemeBot] ⚠️ Konnte Anhang {attachment.id} nicht hashen: {e}")
+        return hashes
+
+    async def check_repost(self, message, settings):
+        """Hasht die Bilder eines neuen Memes, meldet einen Repost und nimmt die Hashes in den Index auf"""
+        hashes = await self.hash_images(message)
+        if not hashes:
+            return
+
+        guild = message.guild
+        tree = self.hash_index.setdefault(guild.id, BKTree())
+        threshold = settings["repost_threshold"]
+        original = None
+        if threshold > 0:
+            for value in hashes:
+                matches = [item for _distance, item in tree.search(value, threshold) if item[0] != message.id]
+                if matches:
+                    original = matches[0]
+                    break
+
+        self.store.add_hashes(guild.id, message.channel.id, message.id, hashes)
+        for value in hashes:
+            tree.add(value, (message.id, message.channel.id))
+
+        if original:
+            message_id, channel_id = original
+            link = f"https://discord.com/channels/{guild.id}/{channel_id}/{message_id}"
+            try:
+                await message.reply(f"♻️ **Repost erkannt!** Das Original gibt es hier: {link}", mention_author=False)
+            except discord.HTTPException:
+                print(f"[MemeBot] ❌ Konnte Repost-Hinweis für Nachricht {message.id} nicht senden.")
+
+    async def rehash_memes(self, ctx):
+        """Berechnet die Bild-Hashes aller gespeicherten Memes aus dem Kanalverlauf neu"""
         guild = ctx.guild
-        data = await self.config.guild(guild).memes()
-
-        now = datetime.utcnow()
-        time_threshold = {
-            "day": now - timedelta(days=1),
-            "week": now - timedelta(weeks=1),
-            "month": now.replace(day=1),
-            "year": now.replace(month=1, day=1),
-            "all": None
-        }.get(time_filter, now.replace(day=1))
-
-        filtered_memes = {
-            msg_id: meme for msg_id, meme in data.items()
-            if time_threshold is None or datetime.utcfromtimestamp(meme["timestamp"]) >= time_threshold
-        }
+        meme_channel_id = await self.config.guild(guild).meme_channel()
 
-        if not filtered_memes:
-            return await ctx.send("❌ Keine Memes gefunden für diesen Zeitraum.")
+        if not meme_channel_id:
+            return await ctx.send("❌ Es wurde noch kein Meme-Kanal festgelegt.")
+
+        meme_channel = guild.get_channel(meme_channel_id)
+        if not meme_channel:
+            return await ctx.send("⚠️ Der gespeicherte Kanal existiert nicht mehr.")
+
+        self.flush_memes()
+        message_ids = set(self.store.message_ids_in_channel(guild.id, meme_channel.id))
+        if not message_ids:
+            return await ctx.send("❌ Keine Memes in diesem Kanal gespeichert.")
+        progress = await ctx.send(f"🔄 Berechne Bild-Hashes neu... 0/{len(message_ids)} Memes")
+
+        entries = []
+        found = 0
+        async for message in meme_channel.history(
+            limit=None,
+            after=discord.Object(id=min(message_ids) - 1),
+            before=discord.Object(id=max(message_ids) + 1),
+            oldest_first=True
+        ):
+            if message.id not in message_ids:
+                continue
+            found += 1
+            hashes = await self.hash_images(message)
+            if hashes:
+                entries.append((message.id, meme_channel.id, hashes))
+            if found % 100 == 0:
+                await progress.edit(content=f"🔄 Berechne Bild-Hashes neu... {found}/{len(message_ids)} Memes")
+
+        self.store.replace_hashes(guild.id, entries)
+        self.build_hash_index(guild.id)
+        await progress.edit(content=f"✅ Bild-Hashes für {len(entries)} von {found} gefundenen Memes neu berechnet.")
 
-        best_meme = max(filtered_memes.values(), key=lambda x: x["upvotes"] - x["downvotes"], default=None)
+    async def get_top_meme(self, ctx, time_filter):
+        """Findet das Bild mit den meisten Netto-Upvotes im aktuellen Kalender-Zeitraum (Tag, ISO-Woche,
+        Monat, Jahr oder insgesamt), direkt aus der gepflegten Bestenliste"""
+        guild = ctx.guild
+
+        if time_filter not in PERIODS:
+            time_filter = "month"
+        self.flush_memes()
+        best_meme = self.store.top_meme(guild.id, time_filter, datetime.now(timezone.utc).timestamp())
 
         if not best_meme:
-            return await ctx.send("❌ Kein Meme gefunden.")
+            return await ctx.send("❌ Keine Memes gefunden für diesen Zeitraum.")
 
         netto_score = best_meme["upvotes"] - best_meme["downvotes"]
         message_link = f"https://discord.com/channels/{guild.id}/{best_meme['channel_id']}/{best_meme['message_id']}"
@@ -56,9 +230,15 @@ class MemeBot(commands.Cog):
         )
 
     async def update_reaction_counts(self, ctx):
-        """Zählt alle Reaktionen auf gespeicherte Memes neu"""
+        """Zählt alle Reaktionen auf gespeicherte Memes neu.
+
+        Statt jedes Meme einzeln per fetch_message zu laden, wird der Kanalverlauf im Zeitraum der
+        gespeicherten Memes durchlaufen (discord.py lädt ihn in Seiten zu je 100 Nachrichten).
+        Nicht mehr gefundene Memes werden zum Entfernen markiert.
+        """
         guild = ctx.guild
-        meme_channel_id = await self.config.guild(guild).meme_channel()
+        guild_config = await self.config.guild(guild).all()
+        meme_channel_id = guild_config["meme_channel"]
 
         if not meme_channel_id:
             return await ctx.send("❌ Es wurde noch kein Meme-Kanal festgelegt.")
@@ -67,31 +247,53 @@ class MemeBot(commands.Cog):
         if not meme_channel:
             return await ctx.send("⚠️ Der gespeicherte Kanal existiert nicht mehr.")
 
-        async with self.config.guild(guild).memes() as memes:
-            updated = 0
-            for message_id, meme in memes.items():
-                try:
-                    message = await meme_channel.fetch_message(int(message_id))
-                    pos_emoji = await self.config.guild(ctx.guild).positive_emoji()
-                    neg_emoji = await self.config.guild(ctx.guild).negative_emoji()
-
-                    upvotes = 0
-                    downvotes = 0
-
-                    for reaction in message.reactions:
-                        if str(reaction.emoji) == pos_emoji:
-                            upvotes = reaction.count - 1  # 🛠️ -1, da der Bot selbst reagiert!
-                        elif str(reaction.emoji) == neg_emoji:
-                            downvotes = reaction.count - 1  # 🛠️ -1, falls der Bot reagiert hat
-
-                    meme["upvotes"] = upvotes
-                    meme["downvotes"] = downvotes
-                    updated += 1
-                except discord.NotFound:
-                    print(f"[MemeBot] ❌ Nachricht {message_id} nicht gefunden, wird ignoriert.")
-
-            await ctx.send(f"✅ Reaktionen für {updated} Memes aktualisiert.")
-
+        pos_emoji = guild_config["positive_emoji"]
+        neg_emoji = guild_config["negative_emoji"]
+        self.flush_memes()
+        message_ids = self.store.message_ids_in_channel(guild.id, meme_channel.id)
+        if not message_ids:
+            return await ctx.send("❌ Keine Memes in diesem Kanal gespeichert.")
+        remaining = set(message_ids)
+        progress = await ctx.send(f"🔄 Zähle Reaktionen neu... 0/{len(remaining)} Memes gefunden")
+
+        counts = {}
+        scanned = 0
+        async for message in meme_channel.history(
+            limit=None,
+            after=discord.Object(id=min(message_ids) - 1),
+            before=discord.Object(id=max(message_ids) + 1),
+            oldest_first=True
+        ):
+            scanned += 1
+            key = message.id
+            if key in remaining:
+                remaining.discard(key)
+                upvotes = 0
+                downvotes = 0
+                for reaction in message.reactions:
+                    # 🛠️ Die eigene Start-Reaktion des Bots zählt nicht mit
+                    own = 1 if reaction.me else 0
+                    if str(reaction.emoji) == pos_emoji:
+                        upvotes = reaction.count - own
+                    elif str(reaction.emoji) == neg_emoji:
+                        downvotes = reaction.count - own
+                counts[key] = (upvotes, downvotes)
+            if scanned % 1000 == 0:
+                await progress.edit(content=(
+                    f"🔄 Zähle Reaktionen neu... {len(counts)}/{len(message_ids)} Memes gefunden "
+                    f"({scanned} Nachrichten durchsucht)"
+                ))
+
+        # Alle Ergebnisse in einer einzigen Transaktion übernehmen
+        self.store.apply_recount(guild.id, counts, remaining)
+
+        text = f"✅ Reaktionen für {len(counts)} Memes aktualisiert ({scanned} Nachrichten durchsucht)."
+        if remaining:
+            text += (
+                f"\n🗑️ {len(remaining)} Memes wurden nicht mehr gefunden und zum Entfernen markiert. "
+                "Mit `!mdma prunedeleted` werden sie gelöscht."
+            )
+        await progress.edit(content=text)
 
     @commands.group(name="mdma", invoke_without_command=True)
     async def mdma(self, ctx):
@@ -103,17 +305,91 @@ class MemeBot(commands.Cog):
         """Zeigt das meistgeupvotete Meme des Monats"""
         await self.get_top_meme(ctx, "month")
 
+    @mdma.command(name="day")
+    async def mdma_day(self, ctx):
+        """Zeigt das meistgeupvotete Meme des Tages"""
+        await self.get_top_meme(ctx, "day")
+
+    @mdma.command(name="week")
+    async def mdma_week(self, ctx):
+        """Zeigt das meistgeupvotete Meme der Woche"""
+        await self.get_top_meme(ctx, "week")
+
+    @mdma.command(name="year")
+    async def mdma_year(self, ctx):
+        """Zeigt das meistgeupvotete Meme des Jahres"""
+        await self.get_top_meme(ctx, "year")
+
+    @mdma.command(name="all")
+    async def mdma_all(self, ctx):
+        """Zeigt das meistgeupvotete Meme aller Zeiten"""
+        await self.get_top_meme(ctx, "all")
+
     @mdma.command(name="updatecounts")
+    @commands.admin()
     async def mdma_updatecounts(self, ctx):
         """Aktualisiert die Upvote- und Downvote-Zahlen aller Memes"""
         await self.update_reaction_counts(ctx)
-        await ctx.send("✅ Alle Upvotes und Downvotes wurden aktualisiert!")
+
+    @mdma.command(name="prunedeleted")
+    @commands.admin()
+    async def mdma_prunedeleted(self, ctx):
+        """Entfernt Memes, die beim Neuzählen nicht mehr gefunden wurden"""
+        self.flush_memes()
+        deleted = self.store.prune_deleted(ctx.guild.id)
+        self.build_hash_index(ctx.guild.id)
+        await ctx.send(f"🗑️ {deleted} gelöschte Memes entfernt.")
+
+    @mdma.command(name="rehash")
+    @commands.admin()
+    async def mdma_rehash(self, ctx):
+        """Baut den Index der Repost-Erkennung aus den gespeicherten Memes neu auf"""
+        await self.rehash_memes(ctx)
+
+    @mdma.command(name="setrepostthreshold")
+    @commands.admin()
+    async def mdma_setrepostthreshold(self, ctx, threshold: int):
+        """Setzt, wie viele Hash-Bits sich für einen Repost höchstens unterscheiden dürfen (0 = aus)"""
+        if not 0 <= threshold <= 20:
+            return await ctx.send("❌ Der Schwellwert muss zwischen 0 und 20 liegen.")
+        await self.config.guild(ctx.guild).repost_threshold.set(threshold)
+        await self.refresh_settings(ctx.guild)
+        if threshold:
+            await ctx.send(f"✅ Repost-Erkennung mit Schwellwert {threshold} aktiviert.")
+        else:
+            await ctx.send("✅ Repost-Erkennung deaktiviert.")
+
+    @mdma.command(name="setretention")
+    @commands.admin()
+    async def mdma_setretention(self, ctx, months: int):
+        """Legt fest, nach wie vielen Monaten Memes zu Monatszusammenfassungen verdichtet werden (0 = nie)"""
+        if not 0 <= months <= MAX_RETENTION_MONTHS:
+            return await ctx.send(f"❌ Die Aufbewahrung muss zwischen 0 und {MAX_RETENTION_MONTHS} Monaten liegen.")
+        await self.config.guild(ctx.guild).retention_months.set(months)
+        if months:
+            await ctx.send(
+                f"✅ Memes werden nach {months} vollen Monaten verdichtet. "
+                "Rangliste und Bestenlisten bleiben dabei erhalten."
+            )
+        else:
+            await ctx.send("✅ Memes werden nicht mehr verdichtet.")
+
+    @mdma.command(name="compact")
+    @commands.admin()
+    async def mdma_compact(self, ctx):
+        """Verdichtet alte Memes sofort gemäß der eingestellten Aufbewahrung"""
+        months = await self.config.guild(ctx.guild).retention_months()
+        if not months:
+            return await ctx.send("❌ Es ist keine Aufbewahrung eingestellt. Nutze `!mdma setretention <monate>`.")
+        compacted = self.compact_guild(ctx.guild.id, months)
+        await ctx.send(f"🗜️ {compacted} Memes zu Monatszusammenfassungen verdichtet.")
 
     @mdma.command(name="setmemechannel")
     @commands.admin()
     async def mdma_setmemechannel(self, ctx, channel: discord.TextChannel):
         """Setzt den Meme-Kanal"""
         await self.config.guild(ctx.guild).meme_channel.set(channel.id)
+        await self.refresh_settings(ctx.guild)
         await ctx.send(f"✅ Meme-Channel wurde auf {channel.mention} gesetzt!")
 
     @mdma.command(name="listchannel")
@@ -131,46 +407,54 @@ class MemeBot(commands.Cog):
             await ctx.send("⚠️ Der gespeicherte Kanal existiert nicht mehr.")
     @mdma.command(name="leaderboard")
     async def mdma_leaderboard(self, ctx, mode: str = "top"):
-        """Zeigt die Top 5 Nutzer oder eine vollständige Liste aller Nutzer mit ihren Netto-Upvotes"""
+        """Zeigt die Top 5 Nutzer, eine Ranglisten-Seite oder eine vollständige Liste aller Nutzer mit ihren Netto-Upvotes"""
         guild = ctx.guild
-        data = await self.config.guild(guild).memes()  # 🔥 KEIN Update der Reaktionen → sofortige Anzeige!
-
-        user_scores = {}
-
-        # 🔍 Jetzt prüfen wir ALLE gespeicherten Werte, OHNE neue Anfragen an Discord
-        for meme in data.values():
-            user_id = meme["author_id"]
-            netto_score = meme["upvotes"] - meme["downvotes"]
-
-            if user_id not in user_scores:
-                user_scores[user_id] = 0
-            user_scores[user_id] += netto_score
+        # 🔥 KEIN Update der Reaktionen → sofortige Anzeige aus den laufend gepflegten Summen
+        self.flush_memes()
+        total = self.store.author_count(guild.id)
 
-        if not user_scores:
+        if not total:
             return await ctx.send("❌ Keine Memes in der Datenbank gefunden.")
 
-        # 🔥 Nutzer nach Netto-Upvotes sortieren
-        sorted_users = sorted(user_scores.items(), key=lambda x: x[1], reverse=True)
+        def username(user_id):
+            user = guild.get_member(user_id)
+            return user.display_name if user else f"Unbekannt ({user_id})"
 
         if mode.lower() == "top":
-            top_5 = sorted_users[:5]
-            leaderboard_text = "🏆 **Top 5 Meme-Künstler:**\n"
-            for i, (user_id, score) in enumerate(top_5, 1):
-                user = guild.get_member(user_id)
-                username = user.display_name if user else f"Unbekannt ({user_id})"
-                leaderboard_text += f"**{i}. {username}** – {score} Netto-Upvotes\n"
-            return await ctx.send(leaderboard_text)
+            lines = ["🏆 **Top 5 Meme-Künstler:**"]
+            for i, (user_id, score) in enumerate(self.store.leaderboard(guild.id, 5), 1):
+                lines.append(f"**{i}. {username(user_id)}** – {score} Netto-Upvotes")
+            return await ctx.send("\n".join(lines))
+
+        elif mode.isdigit():
+            page = max(1, int(mode))
+            pages = (total + LEADERBOARD_PAGE_SIZE - 1) // LEADERBOARD_PAGE_SIZE
+            offset = (page - 1) * LEADERBOARD_PAGE_SIZE
+            lines = [f"📜 **Meme-Scoreboard – Seite {page}/{pages}:**"]
+            for i, (user_id, score) in enumerate(self.store.leaderboard(guild.id, LEADERBOARD_PAGE_SIZE, offset), offset + 1):
+                lines.append(f"**{i}. {username(user_id)}** – {score} Netto-Upvotes")
+            return await ctx.send("\n".join(lines))
 
         elif mode.lower() == "all":
-            leaderboard_text = "📜 **Gesamtes Meme-Scoreboard:**\n"
-            for user_id, score in sorted_users:
-                user = guild.get_member(user_id)
-                username = user.display_name if user else f"Unbekannt ({user_id})"
-                leaderboard_text += f"**{username}** – {score} Netto-Upvotes\n"
-            return await ctx.send(leaderboard_text)
+            # Seitenweise aus der Datenbank lesen und auf Nachrichten unter Discords 2000-Zeichen-Limit verteilen
+            chunk = ["📜 **Gesamtes Meme-Scoreboard:**"]
+            length = len(chunk[0])
+            for offset in range(0, total, 100):
+                for user_id, score in self.store.leaderboard(guild.id, 100, offset):
+                    line = f"**{username(user_id)}** – {score} Netto-Upvotes"
+                    if length + len(line) + 1 > 2000:
+                        await ctx.send("\n".join(chunk))
+                        chunk, length = [], 0
+                    chunk.append(line)
+                    length += len(line) + 1
+            if chunk:
+                await ctx.send("\n".join(chunk))
+            return
 
         else:
-            return await ctx.send("❌ Ungültiger Modus! Nutze `!mdma leaderboard` oder `!mdma leaderboard all`.")
+            return await ctx.send(
+                "❌ Ungültiger Modus! Nutze `!mdma leaderboard`, `!mdma leaderboard <seite>` oder `!mdma leaderboard all`."
+            )
 
     async def mdma_help(self, ctx):
         """Zeigt eine Liste aller Befehle und deren Erklärungen"""
@@ -184,11 +468,17 @@ class MemeBot(commands.Cog):
             "- `!mdma all` → Zeigt das meistgeupvotete Meme aller Zeiten.\n\n"
             "🏆 **Leaderboard & Updates:**\n"
             "- `!mdma leaderboard` → Zeigt die Top 5 Nutzer mit den meisten Netto-Upvotes.\n"
+            "- `!mdma leaderboard <seite>` → Zeigt eine Seite der Rangliste (20 Nutzer pro Seite).\n"
             "- `!mdma leaderboard all` → Zeigt alle Nutzer und ihre Netto-Upvotes.\n"
-            "- `!mdma updatecounts` → Aktualisiert alle Upvote- und Downvote-Zahlen.\n\n"
+            "- `!mdma updatecounts` → Zählt alle Upvotes und Downvotes komplett neu (nur Admins).\n"
+            "- `!mdma prunedeleted` → Entfernt beim Neuzählen nicht mehr gefundene Memes (nur Admins).\n"
+            "- `!mdma rehash` → Berechnet die Bild-Hashes der Repost-Erkennung neu (nur Admins).\n"
+            "- `!mdma compact` → Verdichtet alte Memes sofort zu Monatszusammenfassungen (nur Admins).\n\n"
             "🛠️ **Einstellungen:**\n"
             "- `!mdma setmemechannel <#kanal>` → Legt den Meme-Kanal fest.\n"
-            "- `!mdma listchannel` → Zeigt, welcher Meme-Kanal aktuell eingestellt ist.\n\n"
+            "- `!mdma listchannel` → Zeigt, welcher Meme-Kanal aktuell eingestellt ist.\n"
+            "- `!mdma setrepostthreshold <0-20>` → Empfindlichkeit der Repost-Erkennung (0 = aus).\n"
+            "- `!mdma setretention <monate>` → Memes nach so vielen Monaten verdichten (0 = nie).\n\n"
             "ℹ️ **Hilfe:**\n"
             "- `!mdma help` → Zeigt diese Hilfe an."
         )
@@ -199,30 +489,101 @@ class MemeBot(commands.Cog):
         """Reagiert automatisch auf jede Nachricht im festgelegten Meme-Kanal"""
         if not message.guild:
             return  
+        if message.author.bot:
+            return  # ⏩ Bot-Nachrichten (z.B. der eigene Repost-Hinweis) sind keine Memes
 
-        guild_config = await self.config.guild(message.guild).all()
-        meme_channel = guild_config.get("meme_channel")
+        settings = self.meme_settings.get(message.guild.id)
 
-        if not meme_channel or message.channel.id != meme_channel:
-            return  # ⏩ Ignoriert Nachrichten außerhalb des Meme-Kanals
+        if not settings or message.channel.id != settings["meme_channel"]:
+            return  # ⏩ Ignoriert Nachrichten außerhalb des Meme-Kanals (nur ein Dict-Zugriff)
 
-        pos_emoji = guild_config["positive_emoji"]
-        neg_emoji = guild_config["negative_emoji"]
+        pos_emoji = settings["positive_emoji"]
+        neg_emoji = settings["negative_emoji"]
+
+        # Reaktionen im Hintergrund setzen (nacheinander, damit die Reihenfolge stimmt), ohne den Handler aufzuhalten
+        task = asyncio.create_task(self.add_seed_reactions(message, pos_emoji, neg_emoji))
+        self.reaction_tasks.add(task)
+        task.add_done_callback(self.reaction_tasks.discard)
+
+        # Nur puffern; flush_loop schreibt gesammelt in einer Transaktion
+        self.pending_memes[message.id] = (
+            message.guild.id, message.id, message.channel.id, message.author.id, message.created_at.timestamp()
+        )
+        if len(self.pending_memes) >= MEME_FLUSH_SIZE:
+            self.flush_memes()
+
+        if message.attachments:
+            await self.check_repost(message, settings)
 
+    async def add_seed_reactions(self, message, pos_emoji, neg_emoji):
         try:
             await message.add_reaction(pos_emoji)
             await message.add_reaction(neg_emoji)
             print(f"[MemeBot] ✅ Reaktionen hinzugefügt ({pos_emoji}, {neg_emoji}) für Nachricht {message.id}")
         except discord.Forbidden:
             print(f"[MemeBot] ❌ Fehlende Berechtigungen, um Reaktionen hinzuzufügen.")
+        except discord.HTTPException as e:
+            print(f"[MemeBot] ❌ Reaktionen für Nachricht {message.id} fehlgeschlagen: {e}")
 
-        async with self.config.guild(message.guild).memes() as memes:
-            memes[str(message.id)] = {
-                "message_id": message.id,
-                "channel_id": message.channel.id,
-                "author_id": message.author.id,
-                "timestamp": message.created_at.timestamp(),
-                "upvotes": 0,
-                "downvotes": 0
-            }
-            print(f"[MemeBot] ✅ Nachricht {message.id} wurde als Meme gespeichert.")
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload):
+        """Zählt neue Stimmen auf gespeicherte Memes sofort mit"""
+        await self._apply_vote(payload, 1)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload):
+        """Zieht entfernte Stimmen auf gespeicherte Memes sofort ab"""
+        await self._apply_vote(payload, -1)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_clear(self, payload):
+        """Alle Reaktionen entfernt: Up- und Downvotes des Memes auf 0 setzen"""
+        settings = self._meme_channel_settings(payload)
+        if not settings:
+            return
+        self._clear_votes(payload.message_id, ("upvotes", "downvotes"))
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_clear_emoji(self, payload):
+        """Ein Emoji komplett entfernt: die zugehörigen Stimmen auf 0 setzen"""
+        settings = self._meme_channel_settings(payload)
+        if not settings:
+            return
+        emoji = str(payload.emoji)
+        if emoji == settings["positive_emoji"]:
+            self._clear_votes(payload.message_id, ("upvotes",))
+        elif emoji == settings["negative_emoji"]:
+            self._clear_votes(payload.message_id, ("downvotes",))
+
+    def _meme_channel_settings(self, payload):
+        """Einstellungen des Servers, falls das Reaktions-Event aus dessen Meme-Kanal stammt"""
+        if not payload.guild_id:
+            return None
+        settings = self.meme_settings.get(payload.guild_id)
+        if not settings or payload.channel_id != settings["meme_channel"]:
+            return None
+        return settings
+
+    def _clear_votes(self, message_id, fields):
+        if message_id in self.pending_memes:
+            self.flush_memes()
+        self.store.clear_votes(message_id, fields)
+
+    async def _apply_vote(self, payload, delta):
+        settings = self._meme_channel_settings(payload)
+        if not settings:
+            return
+        if payload.user_id == self.bot.user.id:
+            return  # 🛠️ Die eigenen Start-Reaktionen des Bots zählen nicht
+
+        emoji = str(payload.emoji)
+        if emoji == settings["positive_emoji"]:
+            field = "upvotes"
+        elif emoji == settings["negative_emoji"]:
+            field = "downvotes"
+        else:
+            return
+
+        if payload.message_id in self.pending_memes:
+            self.flush_memes()  # Stimme auf ein noch gepuffertes Meme: erst speichern, dann zählen
+        self.store.add_vote(payload.message_id, field, delta)
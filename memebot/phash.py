@@ -0,0 +1,70 @@
+import io
+
+from PIL import Image
+
+# Fehler beim Dekodieren defekter, fremder oder übergroßer Bilder
+IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def dhash(image_bytes: bytes) -> int:
+    """64-Bit-Differenz-Hash eines Bildes: ähnliche Bilder unterscheiden sich nur in wenigen Bits.
+
+    Läuft synchron (Bild dekodieren und skalieren) und sollte daher in einem Thread ausgeführt werden.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        small = image.convert("L").resize((9, 8), Image.LANCZOS)
+        pixels = list(small.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """BK-Baum über die Hamming-Distanz für schnelle Ähnlichkeitssuche.
+
+    Eine Suche mit kleinem Schwellwert besucht nur die Teilbäume, deren Kantenabstand im Bereich
+    [d - schwelle, d + schwelle] liegt, statt alle gespeicherten Hashes zu vergleichen.
+    """
+
+    def __init__(self):
+        self.root = None  # [hash, wert, {abstand: kindknoten}]
+        self.size = 0
+
+    def add(self, value: int, item):
+        self.size += 1
+        if self.root is None:
+            self.root = [value, item, {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, item, {}]
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> list:
+        """Alle Einträge mit Abstand ≤ max_distance als (abstand, wert), nächster zuerst."""
+        if self.root is None:
+            return []
+        matches = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                matches.append((distance, node[1]))
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        matches.sort(key=lambda match: match[0])
+        return matches
@@ -0,0 +1,484 @@
+import heapq
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memes (
+    message_id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    author_id INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    upvotes INTEGER NOT NULL DEFAULT 0,
+    downvotes INTEGER NOT NULL DEFAULT 0,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_memes_guild_time ON memes (guild_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_memes_guild_author ON memes (guild_id, author_id);
+CREATE TABLE IF NOT EXISTS meme_top (
+    guild_id INTEGER NOT NULL,
+    period TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    message_id INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, period, bucket, message_id)
+);
+CREATE TABLE IF NOT EXISTS author_scores (
+    guild_id INTEGER NOT NULL,
+    author_id INTEGER NOT NULL,
+    score INTEGER NOT NULL DEFAULT 0,
+    memes INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, author_id)
+);
+CREATE INDEX IF NOT EXISTS idx_author_scores_rank ON author_scores (guild_id, score DESC, author_id);
+CREATE TABLE IF NOT EXISTS meme_hashes (
+    message_id INTEGER NOT NULL,
+    attachment INTEGER NOT NULL,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    hash INTEGER NOT NULL,
+    PRIMARY KEY (message_id, attachment)
+);
+CREATE INDEX IF NOT EXISTS idx_meme_hashes_guild ON meme_hashes (guild_id);
+CREATE TABLE IF NOT EXISTS meme_archive (
+    message_id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    author_id INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    upvotes INTEGER NOT NULL,
+    downvotes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_meme_archive_guild_month ON meme_archive (guild_id, month);
+CREATE TABLE IF NOT EXISTS meme_months (
+    guild_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    memes INTEGER NOT NULL,
+    upvotes INTEGER NOT NULL,
+    downvotes INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, month)
+);
+CREATE TABLE IF NOT EXISTS meme_month_authors (
+    guild_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    author_id INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    memes INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, month, author_id)
+);
+"""
+
+# Kandidaten für die Bestenlisten: lebende Memes plus die archivierten Monatssieger verdichteter Monate
+CANDIDATES = (
+    "(SELECT guild_id, message_id, timestamp, upvotes - downvotes AS score FROM memes WHERE deleted = 0 "
+    "UNION ALL SELECT guild_id, message_id, timestamp, upvotes - downvotes AS score FROM meme_archive)"
+)
+
+PERIODS = ("day", "week", "month", "year", "all")
+TOP_K = 5  # Gepflegte Bestenliste pro Zeitraum-Bucket
+
+
+def retention_cutoff(timestamp: float, months: int) -> float:
+    """Beginn (UTC) des Kalendermonats, der `months` Monate vor dem Monat von `timestamp` liegt."""
+    dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    index = dt.year * 12 + dt.month - 1 - months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+def _to_sqlite_int(value: int) -> int:
+    """SQLite speichert nur vorzeichenbehaftete 64-Bit-Zahlen; Bild-Hashes nutzen alle 64 Bit."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _from_sqlite_int(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def bucket_bounds(period: str, timestamp: float):
+    """Kalender-Bucket (UTC) eines Zeitpunkts: (Schlüssel, Beginn, Ende) als Unix-Zeitstempel."""
+    dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    day = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "day":
+        return day.strftime("%Y-%m-%d"), day.timestamp(), (day + timedelta(days=1)).timestamp()
+    if period == "week":
+        iso_year, iso_week, iso_weekday = dt.isocalendar()
+        start = day - timedelta(days=iso_weekday - 1)
+        return f"{iso_year}-W{iso_week:02d}", start.timestamp(), (start + timedelta(weeks=1)).timestamp()
+    if period == "month":
+        start = day.replace(day=1)
+        end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+        return start.strftime("%Y-%m"), start.timestamp(), end.timestamp()
+    if period == "year":
+        start = day.replace(month=1, day=1)
+        return start.strftime("%Y"), start.timestamp(), start.replace(year=start.year + 1).timestamp()
+    return "all", float("-inf"), float("inf")
+
+
+class MemeStore:
+    """SQLite-Speicher für Memes (eine Zeile pro Meme, WAL-Modus).
+
+    Neue Memes und Stimmen sind einzelne Zeilenoperationen, statt wie zuvor das komplette
+    `memes`-Dict aus der Red-Config zu laden und zurückzuschreiben.
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        if self.conn.execute("SELECT 1 FROM meme_top LIMIT 1").fetchone() is None:
+            self.rebuild_top_index()
+        if self.conn.execute("SELECT 1 FROM author_scores LIMIT 1").fetchone() is None:
+            self.rebuild_author_scores()
+
+    def close(self):
+        self.conn.close()
+
+    def add_meme(self, guild_id: int, message_id: int, channel_id: int, author_id: int, timestamp: float):
+        self.add_memes([(guild_id, message_id, channel_id, author_id, timestamp)])
+
+    def add_memes(self, memes: list):
+        """Speichert neue Memes als (guild_id, message_id, channel_id, author_id, timestamp) in einer Transaktion."""
+        with self.conn:
+            for guild_id, message_id, channel_id, author_id, timestamp in memes:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO memes (message_id, guild_id, channel_id, author_id, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (message_id, guild_id, channel_id, author_id, timestamp)
+                )
+                if cursor.rowcount:
+                    self._update_top(guild_id, message_id, timestamp, 0, False)
+                    self._add_author_score(guild_id, author_id, 0, 1)
+
+    def import_memes(self, guild_id: int, memes: list):
+        """Übernimmt Memes im alten Config-Format; bereits vorhandene werden übersprungen.
+
+        Bestenlisten und Nutzersummen werden nicht angepasst – nach dem letzten Block einmal
+        `rebuild_top_index` und `rebuild_author_scores` für den Server aufrufen.
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO memes "
+                "(message_id, guild_id, channel_id, author_id, timestamp, upvotes, downvotes, deleted) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        meme["message_id"], guild_id, meme["channel_id"], meme["author_id"], meme["timestamp"],
+                        meme.get("upvotes", 0), meme.get("downvotes", 0), int(bool(meme.get("deleted")))
+                    )
+                    for meme in memes
+                ]
+            )
+
+    def add_vote(self, message_id: int, column: str, delta: int) -> bool:
+        """Ändert Up- oder Downvotes eines Memes um delta; False, wenn das Meme nicht gespeichert ist."""
+        if column not in ("upvotes", "downvotes"):
+            raise ValueError(column)
+        with self.conn:
+            before = self.conn.execute(
+                "SELECT upvotes - downvotes AS score FROM memes WHERE message_id = ?", (message_id,)
+            ).fetchone()
+            if before is None:
+                return False
+            self.conn.execute(
+                f"UPDATE memes SET {column} = MAX(0, {column} + ?) WHERE message_id = ?",
+                (delta, message_id)
+            )
+            self._after_vote_change(message_id, before["score"])
+        return True
+
+    def clear_votes(self, message_id: int, columns) -> bool:
+        """Setzt Up- und/oder Downvotes eines Memes auf 0 (Reaktionen von Moderatoren entfernt)."""
+        columns = tuple(columns)
+        if not columns or any(column not in ("upvotes", "downvotes") for column in columns):
+            raise ValueError(columns)
+        with self.conn:
+            before = self.conn.execute(
+                "SELECT upvotes - downvotes AS score FROM memes WHERE message_id = ?", (message_id,)
+            ).fetchone()
+            if before is None:
+                return False
+            self.conn.execute(
+                f"UPDATE memes SET {', '.join(f'{column} = 0' for column in columns)} WHERE message_id = ?",
+                (message_id,)
+            )
+            self._after_vote_change(message_id, before["score"])
+        return True
+
+    def _after_vote_change(self, message_id: int, score_before: int):
+        """Zieht Bestenlisten und Nutzersumme nach einer Stimmenänderung nach (innerhalb der Transaktion)."""
+        meme = self.conn.execute(
+            "SELECT guild_id, author_id, timestamp, upvotes - downvotes AS score, deleted FROM memes "
+            "WHERE message_id = ?",
+            (message_id,)
+        ).fetchone()
+        self._update_top(meme["guild_id"], message_id, meme["timestamp"], meme["score"], bool(meme["deleted"]))
+        self._add_author_score(meme["guild_id"], meme["author_id"], meme["score"] - score_before, 0)
+
+    def message_ids_in_channel(self, guild_id: int, channel_id: int) -> list:
+        rows = self.conn.execute(
+            "SELECT message_id FROM memes WHERE guild_id = ? AND channel_id = ?", (guild_id, channel_id)
+        )
+        return [row["message_id"] for row in rows]
+
+    def apply_recount(self, guild_id: int, counts: dict, missing_ids):
+        """Schreibt neu gezählte Stimmen und markiert nicht gefundene Memes – in einer Transaktion."""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE memes SET upvotes = ?, downvotes = ?, deleted = 0 WHERE message_id = ?",
+                [(upvotes, downvotes, message_id) for message_id, (upvotes, downvotes) in counts.items()]
+            )
+            self.conn.executemany(
+                "UPDATE memes SET deleted = 1 WHERE message_id = ?", [(message_id,) for message_id in missing_ids]
+            )
+        # Nach einer Komplettzählung ist ein Neuaufbau günstiger als viele Einzelkorrekturen
+        self.rebuild_top_index(guild_id)
+        self.rebuild_author_scores(guild_id)
+
+    def prune_deleted(self, guild_id: int) -> int:
+        # Nur die gelöschten Memes selbst erfassen; archivierte Monatssieger haben keine Zeile in `memes`
+        deleted = "(SELECT message_id FROM memes WHERE guild_id = ? AND deleted = 1)"
+        with self.conn:
+            self.conn.execute(f"DELETE FROM meme_hashes WHERE message_id IN {deleted}", (guild_id,))
+            self.conn.execute(f"DELETE FROM meme_top WHERE message_id IN {deleted}", (guild_id,))
+            cursor = self.conn.execute("DELETE FROM memes WHERE guild_id = ? AND deleted = 1", (guild_id,))
+        self.rebuild_author_scores(guild_id)
+        return cursor.rowcount
+
+    def top_meme(self, guild_id: int, period: str, timestamp: float):
+        """Meme mit der höchsten Netto-Wertung im Kalender-Bucket von `timestamp` – direkt aus dem Index.
+
+        Der Sieger kann auch ein archivierter Monatssieger eines verdichteten Monats sein.
+        """
+        bucket, _start, _end = bucket_bounds(period, timestamp)
+        top = self.conn.execute(
+            "SELECT message_id FROM meme_top WHERE guild_id = ? AND period = ? AND bucket = ? "
+            "ORDER BY score DESC, message_id LIMIT 1",
+            (guild_id, period, bucket)
+        ).fetchone()
+        if top is None:
+            return None
+        for table in ("memes", "meme_archive"):
+            meme = self.conn.execute(
+                f"SELECT message_id, channel_id, author_id, timestamp, upvotes, downvotes FROM {table} "
+                "WHERE message_id = ?",
+                (top["message_id"],)
+            ).fetchone()
+            if meme is not None:
+                return meme
+        return None
+
+    def _update_top(self, guild_id: int, message_id: int, timestamp: float, score: int, deleted: bool):
+        """Pflegt die Bestenlisten aller Buckets, in die ein Meme fällt, nach einer Änderung.
+
+        Pro Bucket werden die TOP_K besten Memes gehalten (bzw. alle, falls es weniger gibt).
+        Nur wenn ein Mitglied einer vollen Liste Punkte verliert, könnte ein Meme außerhalb der
+        Liste nachrücken; dann wird der Bucket über den (guild_id, timestamp)-Index neu bestimmt.
+        """
+        for period in PERIODS:
+            bucket, start, end = bucket_bounds(period, timestamp)
+            members = {
+                row["message_id"]: row["score"]
+                for row in self.conn.execute(
+                    "SELECT message_id, score FROM meme_top WHERE guild_id = ? AND period = ? AND bucket = ?",
+                    (guild_id, period, bucket)
+                )
+            }
+            if message_id in members:
+                if deleted or (score < members[message_id] and len(members) >= TOP_K):
+                    self._rebuild_bucket(guild_id, period, bucket, start, end)
+                else:
+                    self.conn.execute(
+                        "UPDATE meme_top SET score = ? WHERE guild_id = ? AND period = ? AND bucket = ? AND message_id = ?",
+                        (score, guild_id, period, bucket, message_id)
+                    )
+            elif not deleted and (len(members) < TOP_K or score > min(members.values())):
+                self.conn.execute(
+                    "INSERT INTO meme_top (guild_id, period, bucket, message_id, score) VALUES (?, ?, ?, ?, ?)",
+                    (guild_id, period, bucket, message_id, score)
+                )
+                if len(members) >= TOP_K:
+                    weakest = min(members, key=lambda m: (members[m], -m))
+                    self.conn.execute(
+                        "DELETE FROM meme_top WHERE guild_id = ? AND period = ? AND bucket = ? AND message_id = ?",
+                        (guild_id, period, bucket, weakest)
+                    )
+
+    def _rebuild_bucket(self, guild_id: int, period: str, bucket: str, start: float, end: float):
+        self.conn.execute(
+            "DELETE FROM meme_top WHERE guild_id = ? AND period = ? AND bucket = ?", (guild_id, period, bucket)
+        )
+        self.conn.execute(
+            "INSERT INTO meme_top (guild_id, period, bucket, message_id, score) "
+            f"SELECT guild_id, ?, ?, message_id, score FROM {CANDIDATES} "
+            "WHERE guild_id = ? AND timestamp >= ? AND timestamp < ? "
+            "ORDER BY score DESC, message_id LIMIT ?",
+            (period, bucket, guild_id, start, end, TOP_K)
+        )
+
+    def rebuild_top_index(self, guild_id: int = None):
+        """Baut die Bestenlisten in einem Durchlauf über alle Memes neu auf (z.B. nach der Migration).
+
+        Für verdichtete Monate stehen nur noch die archivierten Monatssieger zur Verfügung. Das genügt
+        für Monat, Jahr und insgesamt; Tages- und Wochenlisten dieser Monate werden nicht mehr abgefragt.
+        """
+        where, params = ("WHERE guild_id = ?", (guild_id,)) if guild_id is not None else ("", ())
+        best = {}  # (guild_id, period, bucket) -> Heap der TOP_K (score, -message_id)
+        for row in self.conn.execute(
+            f"SELECT guild_id, message_id, timestamp, score FROM {CANDIDATES} {where}", params
+        ):
+            for period in PERIODS:
+                bucket = bucket_bounds(period, row["timestamp"])[0]
+                heap = best.setdefault((row["guild_id"], period, bucket), [])
+                entry = (row["score"], -row["message_id"])
+                if len(heap) < TOP_K:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+        with self.conn:
+            if guild_id is not None:
+                self.conn.execute("DELETE FROM meme_top WHERE guild_id = ?", (guild_id,))
+            else:
+                self.conn.execute("DELETE FROM meme_top")
+            self.conn.executemany(
+                "INSERT INTO meme_top (guild_id, period, bucket, message_id, score) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (g, period, bucket, -negative_id, score)
+                    for (g, period, bucket), heap in best.items()
+                    for score, negative_id in heap
+                ]
+            )
+
+    def _add_author_score(self, guild_id: int, author_id: int, score_delta: int, memes_delta: int):
+        self.conn.execute(
+            "INSERT INTO author_scores (guild_id, author_id, score, memes) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (guild_id, author_id) DO UPDATE SET "
+            "score = score + excluded.score, memes = memes + excluded.memes",
+            (guild_id, author_id, score_delta, memes_delta)
+        )
+
+    def rebuild_author_scores(self, guild_id: int = None):
+        """Berechnet die Netto-Wertung pro Nutzer komplett neu (Migration, Neuzählung, Aufräumen).
+
+        Die Summen verdichteter Monate fließen aus `meme_month_authors` mit ein.
+        """
+        where, params = ("WHERE guild_id = ?", (guild_id,)) if guild_id is not None else ("", ())
+        with self.conn:
+            self.conn.execute(f"DELETE FROM author_scores {where}", params)
+            self.conn.execute(
+                "INSERT INTO author_scores (guild_id, author_id, score, memes) "
+                "SELECT guild_id, author_id, SUM(score), SUM(memes) FROM ("
+                "SELECT guild_id, author_id, upvotes - downvotes AS score, 1 AS memes FROM memes "
+                "UNION ALL SELECT guild_id, author_id, score, memes FROM meme_month_authors"
+                f") {where} GROUP BY guild_id, author_id",
+                params
+            )
+
+    def leaderboard(self, guild_id: int, limit: int, offset: int = 0) -> list:
+        """Eine Seite der Rangliste als (author_id, Netto-Wertung), direkt über den Rang-Index."""
+        rows = self.conn.execute(
+            "SELECT author_id, score FROM author_scores WHERE guild_id = ? "
+            "ORDER BY score DESC, author_id LIMIT ? OFFSET ?",
+            (guild_id, limit, offset)
+        )
+        return [(row["author_id"], row["score"]) for row in rows]
+
+    def author_count(self, guild_id: int) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM author_scores WHERE guild_id = ?", (guild_id,)
+        ).fetchone()[0]
+
+    def add_hashes(self, guild_id: int, channel_id: int, message_id: int, hashes: list):
+        """Speichert die Bild-Hashes (einer pro Anhang) eines Memes."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meme_hashes (message_id, attachment, guild_id, channel_id, hash) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (message_id, index, guild_id, channel_id, _to_sqlite_int(value))
+                    for index, value in enumerate(hashes)
+                ]
+            )
+
+    def replace_hashes(self, guild_id: int, entries: list):
+        """Ersetzt alle Bild-Hashes eines Servers durch (message_id, channel_id, [hashes])-Einträge."""
+        with self.conn:
+            self.conn.execute("DELETE FROM meme_hashes WHERE guild_id = ?", (guild_id,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meme_hashes (message_id, attachment, guild_id, channel_id, hash) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (message_id, index, guild_id, channel_id, _to_sqlite_int(value))
+                    for message_id, channel_id, hashes in entries
+                    for index, value in enumerate(hashes)
+                ]
+            )
+
+    def iter_hashes(self, guild_id: int = None):
+        """Alle gespeicherten Bild-Hashes als (guild_id, message_id, channel_id, hash)."""
+        where, params = ("WHERE guild_id = ?", (guild_id,)) if guild_id is not None else ("", ())
+        for row in self.conn.execute(
+            f"SELECT guild_id, message_id, channel_id, hash FROM meme_hashes {where}", params
+        ):
+            yield row["guild_id"], row["message_id"], row["channel_id"], _from_sqlite_int(row["hash"])
+
+    def compact(self, guild_id: int, cutoff: float) -> int:
+        """Verdichtet alle Memes vor `cutoff` zu Monatszusammenfassungen und löscht ihre Einzelzeilen.
+
+        Pro Monat bleiben Anzahl und Stimmensummen (`meme_months`), die Summen pro Nutzer
+        (`meme_month_authors`) und die TOP_K besten Memes (`meme_archive`) erhalten. `author_scores`
+        und die Bestenlisten für Jahr und insgesamt bleiben dadurch unverändert.
+        """
+        month = "strftime('%Y-%m', timestamp, 'unixepoch')"
+        old = "FROM memes WHERE guild_id = ? AND timestamp < ?"
+        best = {}  # Monat -> Heap der TOP_K (score, -message_id, Zeile)
+        for row in self.conn.execute(
+            f"SELECT {month} AS month, message_id, channel_id, author_id, timestamp, upvotes, downvotes {old} "
+            "AND deleted = 0 UNION ALL "
+            "SELECT month, message_id, channel_id, author_id, timestamp, upvotes, downvotes FROM meme_archive "
+            f"WHERE guild_id = ? AND month IN (SELECT DISTINCT {month} {old})",
+            (guild_id, cutoff, guild_id, guild_id, cutoff)
+        ):
+            heap = best.setdefault(row["month"], [])
+            entry = (row["upvotes"] - row["downvotes"], -row["message_id"], tuple(row))
+            if len(heap) < TOP_K:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO meme_months (guild_id, month, memes, upvotes, downvotes) "
+                f"SELECT guild_id, {month}, COUNT(*), SUM(upvotes), SUM(downvotes) {old} GROUP BY 2 "
+                "ON CONFLICT (guild_id, month) DO UPDATE SET memes = memes + excluded.memes, "
+                "upvotes = upvotes + excluded.upvotes, downvotes = downvotes + excluded.downvotes",
+                (guild_id, cutoff)
+            )
+            self.conn.execute(
+                "INSERT INTO meme_month_authors (guild_id, month, author_id, score, memes) "
+                f"SELECT guild_id, {month}, author_id, SUM(upvotes - downvotes), COUNT(*) {old} GROUP BY 2, 3 "
+                "ON CONFLICT (guild_id, month, author_id) DO UPDATE SET "
+                "score = score + excluded.score, memes = memes + excluded.memes",
+                (guild_id, cutoff)
+            )
+            self.conn.executemany(
+                "DELETE FROM meme_archive WHERE guild_id = ? AND month = ?", [(guild_id, m) for m in best]
+            )
+            self.conn.executemany(
+                "INSERT INTO meme_archive "
+                "(month, message_id, channel_id, author_id, timestamp, upvotes, downvotes, guild_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [row + (guild_id,) for heap in best.values() for _score, _id, row in heap]
+            )
+            cursor = self.conn.execute(f"DELETE {old}", (guild_id, cutoff))
+            # Listeneinträge ohne Meme-Zeile und ohne Archiv-Eintrag (alte Tage und Wochen) entfernen
+            self.conn.execute(
+                "DELETE FROM meme_top WHERE guild_id = ? "
+                "AND message_id NOT IN (SELECT message_id FROM memes WHERE guild_id = ?) "
+                "AND message_id NOT IN (SELECT message_id FROM meme_archive WHERE guild_id = ?)",
+                (guild_id, guild_id, guild_id)
+            )
+        return cursor.rowcount